@@ -1,11 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Response, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, status, Response
 from fastapi.security import OAuth2PasswordRequestForm
 from backend.models.user import UserCreate, UserResponse
 from backend.services.auth import AuthService
 from backend.core.security import get_current_user
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+from backend.services.mailer import Mailer
 from backend.core.config import settings
 import logging
 from typing import Dict, Any
@@ -13,32 +11,6 @@ from typing import Dict, Any
 router = APIRouter()
 auth_service = AuthService()
 
-async def send_email_background(
-    recipient_email: str,
-    subject: str,
-    body: str
-) -> None:
-    try:
-        msg = MIMEMultipart()
-        msg['From'] = settings.SMTP_USERNAME
-        msg['To'] = recipient_email
-        msg['Subject'] = subject
-        
-        msg.attach(MIMEText(body, 'plain'))
-        
-        with smtplib.SMTP(settings.SMTP_SERVER, settings.SMTP_PORT) as server:
-            server.starttls()
-            server.login(settings.SMTP_USERNAME, settings.SMTP_PASSWORD)
-            server.send_message(msg)
-            
-        logging.info(f"Password reset email sent successfully to {recipient_email}")
-    except Exception as e:
-        logging.error(f"Failed to send email: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to send email"
-        )
-
 @router.post("/login")
 async def login(form_data: OAuth2PasswordRequestForm = Depends()) -> Dict[str, Any]:
     user = await auth_service.authenticate_user(form_data.username, form_data.password)
@@ -73,10 +45,7 @@ async def register(user: UserCreate):
     return await auth_service.create_user(user)
 
 @router.post("/forgot-password")
-async def forgot_password(
-    email: str,
-    background_tasks: BackgroundTasks
-) -> Dict[str, Any]:
+async def forgot_password(email: str) -> Dict[str, Any]:
     try:
         # Generate reset token
         reset_token = await auth_service.send_password_reset_email(email)
@@ -96,13 +65,8 @@ async def forgot_password(
         Your App Team
         """
         
-        # Add email sending to background tasks
-        background_tasks.add_task(
-            send_email_background,
-            recipient_email=email,
-            subject="Password Reset Request",
-            body=email_body
-        )
+        # Queue the email; the mail worker delivers it outside the request
+        await Mailer.enqueue(email, "Password Reset Request", email_body)
         
         return {
             "success": True,
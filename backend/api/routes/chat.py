@@ -1,31 +1,103 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
-from backend.models.chat import ChatMessage, ChatResponse, ChatSession
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from typing import List, Literal, Optional, Union
+from datetime import datetime
+from backend.models.chat import ChatMessage, ChatResponse, ChatSession, SessionSummaryPage
 from backend.services.chat import ChatService
+from backend.services.search import SearchService
+from backend.services.export import ExportService
 from backend.core.security import get_current_user
+from backend.core.responses import FastJSONResponse
 
 router = APIRouter()
 chat_service = ChatService()
+search_service = SearchService()
+export_service = ExportService()
 
 @router.post("/sessions", response_model=ChatSession)
 async def create_session(current_user: dict = Depends(get_current_user)):
     return await chat_service.create_session(str(current_user["_id"]))
 
-@router.get("/sessions", response_model=List[ChatSession])
-async def get_sessions(current_user: dict = Depends(get_current_user)):
-    return await chat_service.get_user_sessions(str(current_user["_id"]))
+@router.get("/sessions", response_model=Union[List[ChatSession], SessionSummaryPage])
+async def get_sessions(
+    request: Request,
+    summary: bool = False,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    current_user: dict = Depends(get_current_user)
+):
+    # Responses are serialized once from the service's models, skipping response_model re-validation
+    if summary:
+        page = await chat_service.get_user_session_summaries(
+            str(current_user["_id"]), cursor=cursor, limit=limit
+        )
+        return FastJSONResponse(page, request)
+    return FastJSONResponse(await chat_service.get_user_sessions(str(current_user["_id"])), request)
+
+@router.get("/search")
+async def search_history(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=200),
+    offset: int = Query(0, ge=0, le=1000),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: dict = Depends(get_current_user)
+):
+    results = await search_service.search(str(current_user["_id"]), q, offset=offset, limit=limit)
+    return FastJSONResponse(results, request)
+
+@router.get("/export")
+async def export_history(
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    compress: bool = Query(False, alias="gzip"),
+    session_id: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    chunks = await export_service.open_export(
+        str(current_user["_id"]), export_format, compress=compress, session_id=session_id
+    )
+    filename = f"chat-export-{datetime.utcnow():%Y%m%dT%H%M%S}.{export_format}"
+    media_type = "application/x-ndjson" if export_format == "ndjson" else "text/csv; charset=utf-8"
+    if compress:
+        filename += ".gz"
+        media_type = "application/gzip"
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "Cache-Control": "no-store",
+            "X-Accel-Buffering": "no"
+        }
+    )
 
 @router.post("/{session_id}/send", response_model=ChatResponse)
 async def send_message(
     session_id: str,
     message: ChatMessage,
+    stream: bool = False,
+    bypass_cache: bool = False,
     current_user: dict = Depends(get_current_user)
 ):
-    return await chat_service.process_message(message.text, session_id, current_user)
+    use_cache = not bypass_cache
+    if stream:
+        events = await chat_service.stream_message(message.text, session_id, current_user, use_cache)
+        return StreamingResponse(
+            events,
+            media_type="application/x-ndjson",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+    return await chat_service.process_message(message.text, session_id, current_user, use_cache)
 
 @router.get("/{session_id}/messages", response_model=List[ChatMessage])
 async def get_session_messages(
+    request: Request,
     session_id: str,
+    before: Optional[str] = None,
+    after: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
     current_user: dict = Depends(get_current_user)
 ):
-    return await chat_service.get_session_messages(session_id, str(current_user["_id"]))
\ No newline at end of file
+    messages = await chat_service.get_session_messages(
+        session_id, str(current_user["_id"]), before=before, after=after, limit=limit
+    )
+    return FastJSONResponse(messages, request)
\ No newline at end of file
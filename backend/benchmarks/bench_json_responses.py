@@ -0,0 +1,110 @@
+"""
+Benchmark CPU per response for the chat list endpoints: FastAPI's default
+response_model path (re-validate, jsonable_encoder, json.dumps) versus
+FastJSONResponse serializing the service's models once, with and without
+gzip.
+
+    python -m backend.benchmarks.bench_json_responses --messages 200 --sessions 50 --iterations 200
+"""
+from backend.core.responses import FastJSONResponse, orjson
+from backend.models.chat import ChatMessage, ChatSession
+from datetime import datetime, timedelta
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from starlette.requests import Request
+from typing import List
+import argparse
+import asyncio
+import json
+import time
+
+
+def _messages(count: int) -> List[ChatMessage]:
+    started = datetime.utcnow()
+    text = "Inventory cover for the northern DCs dropped below two weeks after the supplier delay. "
+    return [
+        ChatMessage(
+            id=f"{i:024x}",
+            text=text * 4,
+            sender="user" if i % 2 else "bot",
+            session_id="65f000000000000000000000",
+            timestamp=started + timedelta(seconds=i),
+        )
+        for i in range(count)
+    ]
+
+
+def _sessions(count: int) -> List[ChatSession]:
+    started = datetime.utcnow()
+    return [
+        ChatSession(
+            id=f"{i:024x}",
+            title="New Analysis",
+            last_message="Lead times on the critical components are trending up.",
+            user_id="65f000000000000000000001",
+            timestamp=started - timedelta(minutes=i),
+        )
+        for i in range(count)
+    ]
+
+
+def _request(accept_encoding: str) -> Request:
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [(b"accept-encoding", accept_encoding.encode())],
+    })
+
+
+async def _measure(name: str, render, iterations: int) -> dict:
+    await render()
+    started = time.process_time()
+    for _ in range(iterations):
+        body = await render()
+    cpu = time.process_time() - started
+    return {
+        "path": name,
+        "cpu_us_per_response": round(cpu / iterations * 1_000_000, 1),
+        "bytes": len(body),
+    }
+
+
+async def _compare(label: str, models: list, response_type, iterations: int) -> List[dict]:
+    field = create_response_field(name=f"Response_{label}", type_=response_type)
+    plain, gzipped = _request(""), _request("gzip, deflate, br")
+
+    async def fastapi_default() -> bytes:
+        content = await serialize_response(field=field, response_content=models)
+        return JSONResponse(content).body
+
+    async def fast_json() -> bytes:
+        return FastJSONResponse(models, plain).body
+
+    async def fast_json_gzip() -> bytes:
+        return FastJSONResponse(models, gzipped).body
+
+    results = [
+        await _measure("response_model", fastapi_default, iterations),
+        await _measure("fast_json", fast_json, iterations),
+        await _measure("fast_json_gzip", fast_json_gzip, iterations),
+    ]
+    for result in results:
+        result["endpoint"] = label
+    return results
+
+
+async def main(messages: int, sessions: int, iterations: int) -> None:
+    results = await _compare("messages", _messages(messages), List[ChatMessage], iterations)
+    results += await _compare("sessions", _sessions(sessions), List[ChatSession], iterations)
+    print(json.dumps({"orjson": orjson is not None, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--messages", type=int, default=200, help="Messages per /messages page")
+    parser.add_argument("--sessions", type=int, default=50, help="Sessions per /sessions response")
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.messages, args.sessions, args.iterations))
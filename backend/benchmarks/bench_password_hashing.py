@@ -0,0 +1,89 @@
+"""
+Benchmark login throughput with bcrypt inline on the event loop versus
+offloaded to the PasswordHasher process pool.
+
+Alongside throughput, a ticker task measures how long the event loop is
+stalled, which is what every other request on the worker experiences
+during a login burst.
+
+    python -m backend.benchmarks.bench_password_hashing --logins 64 --concurrency 16
+"""
+from backend.core.hashing import PasswordHasher, pwd_context
+from fastapi import HTTPException
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+
+async def _measure_loop_lag(stop: asyncio.Event, samples: list, interval: float = 0.01) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(time.perf_counter() - started - interval)
+
+
+async def _run(mode: str, hashed: str, logins: int, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    rejected = 0
+
+    async def login() -> None:
+        nonlocal rejected
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                if mode == "inline":
+                    pwd_context.verify("correct horse battery staple", hashed)
+                else:
+                    await PasswordHasher.verify("correct horse battery staple", hashed)
+            except HTTPException:
+                rejected += 1
+                return
+            latencies.append(time.perf_counter() - started)
+
+    stop = asyncio.Event()
+    lag_samples: list = []
+    ticker = asyncio.create_task(_measure_loop_lag(stop, lag_samples))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await ticker
+
+    latencies.sort()
+    return {
+        "mode": mode,
+        "logins": logins,
+        "rejected": rejected,
+        "throughput_per_s": round(len(latencies) / elapsed, 2),
+        "p50_ms": round(statistics.median(latencies) * 1000, 1) if latencies else None,
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 1) if latencies else None,
+        "max_loop_stall_ms": round(max(lag_samples, default=0) * 1000, 1),
+    }
+
+
+async def main(logins: int, concurrency: int) -> None:
+    hashed = pwd_context.hash("correct horse battery staple")
+    PasswordHasher.start()
+    try:
+        # Warm the worker processes so start-up cost is not measured
+        await asyncio.gather(*(PasswordHasher.hash("warm-up") for _ in range(4)))
+        results = [
+            await _run("inline", hashed, logins, concurrency),
+            await _run("process_pool", hashed, logins, concurrency),
+        ]
+    finally:
+        PasswordHasher.shutdown()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+    asyncio.run(main(args.logins, args.concurrency))
@@ -0,0 +1,217 @@
+"""
+Offline load test for backend.main:app.
+
+Boots the app in-process against local stand-ins (in-memory MongoDB, fake
+Redis, stub LLM), drives a weighted mix of login, create-session, send and
+list-sessions traffic from concurrent virtual users, and reports throughput
+plus p50/p95/p99 latency per endpoint. Results are written as JSON so runs
+can be compared across versions.
+
+    pip install -r backend/benchmarks/requirements.txt
+    python -m backend.benchmarks.load_test --users 50 --duration 60
+    python -m backend.benchmarks.load_test --compare backend/benchmarks/results/<earlier>.json
+"""
+from backend.benchmarks.standins import configure_environment, install_databases
+from backend.benchmarks.stub_llm import StubLLM
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import time
+
+RESULTS_DIR = Path(__file__).parent / "results"
+DEFAULT_MIX = {"login": 5, "create_session": 5, "send": 30, "list_sessions": 60}
+
+
+def _percentile(values: List[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return round(ordered[index] * 1000, 2)
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except Exception:
+        return None
+
+
+class VirtualUser:
+    """One simulated analyst with their own account, token and sessions"""
+
+    def __init__(self, client, index: int, prompts: List[str]):
+        self.client = client
+        self.email = f"bench-user-{index}@example.com"
+        self.password = "bench-password"
+        self.prompts = prompts
+        self.headers: Dict[str, str] = {}
+        self.sessions: List[str] = []
+
+    async def register(self) -> None:
+        await self.client.post("/api/auth/register", json={
+            "email": self.email, "full_name": "Bench User", "password": self.password
+        })
+
+    async def login(self):
+        response = await self.client.post(
+            "/api/auth/login", data={"username": self.email, "password": self.password}
+        )
+        if response.status_code == 200:
+            self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        return response
+
+    async def create_session(self):
+        response = await self.client.post("/api/chat/sessions", headers=self.headers)
+        if response.status_code == 200:
+            self.sessions.append(response.json()["id"])
+        return response
+
+    async def send(self):
+        if not self.sessions:
+            return await self.create_session()
+        session_id = random.choice(self.sessions)
+        return await self.client.post(
+            f"/api/chat/{session_id}/send",
+            json={"text": random.choice(self.prompts)},
+            headers=self.headers,
+        )
+
+    async def list_sessions(self):
+        return await self.client.get("/api/chat/sessions", headers=self.headers)
+
+
+async def run(args) -> Dict:
+    llm = StubLLM(args.llm_latency, args.llm_tokens, args.llm_tokens_per_second)
+    configure_environment(llm, rate_limit=args.rate_limit, engine=args.engine)
+
+    # Imported only now so settings pick up the stand-in environment
+    import httpx
+    from backend.main import app
+
+    install_databases()
+    mix = dict(DEFAULT_MIX)
+    if args.mix:
+        mix = {name: float(weight) for name, weight in (part.split("=") for part in args.mix.split(","))}
+    prompts = [f"Summarize supply chain risk for region {i}" for i in range(args.distinct_prompts)]
+
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    statuses: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            users = [VirtualUser(client, i, prompts) for i in range(args.users)]
+            for user in users:
+                await user.register()
+                await user.login()
+                await user.create_session()
+
+            operations = list(mix)
+            weights = [mix[name] for name in operations]
+            deadline = time.perf_counter() + args.duration
+
+            async def drive(user: VirtualUser) -> None:
+                while time.perf_counter() < deadline:
+                    name = random.choices(operations, weights)[0]
+                    started = time.perf_counter()
+                    try:
+                        response = await getattr(user, name)()
+                        status = str(response.status_code)
+                    except Exception as e:
+                        status = type(e).__name__
+                    latencies[name].append(time.perf_counter() - started)
+                    statuses[name][status] += 1
+                    if args.think_time:
+                        await asyncio.sleep(random.expovariate(1 / args.think_time))
+
+            started = time.perf_counter()
+            await asyncio.gather(*(drive(user) for user in users))
+            elapsed = time.perf_counter() - started
+
+    endpoints = {}
+    for name, values in latencies.items():
+        endpoints[name] = {
+            "requests": len(values),
+            "throughput_per_s": round(len(values) / elapsed, 2),
+            "p50_ms": _percentile(values, 50),
+            "p95_ms": _percentile(values, 95),
+            "p99_ms": _percentile(values, 99),
+            "statuses": dict(statuses[name]),
+        }
+    total = sum(len(values) for values in latencies.values())
+    return {
+        "created_at": datetime.utcnow().isoformat(),
+        "git_revision": _git_revision(),
+        "config": {
+            "users": args.users,
+            "duration_s": args.duration,
+            "think_time_s": args.think_time,
+            "mix": mix,
+            "distinct_prompts": args.distinct_prompts,
+            "rate_limit": args.rate_limit,
+            "engine": args.engine,
+            "llm": {
+                "latency_s": args.llm_latency,
+                "tokens": args.llm_tokens,
+                "tokens_per_second": args.llm_tokens_per_second,
+            },
+        },
+        "elapsed_s": round(elapsed, 2),
+        "total": {"requests": total, "throughput_per_s": round(total / elapsed, 2)},
+        "endpoints": endpoints,
+        "llm_requests": llm.requests,
+    }
+
+
+def compare(current: Dict, baseline: Dict) -> None:
+    """Print per-endpoint changes against an earlier result"""
+    print(f"\nCompared with {baseline.get('git_revision')} ({baseline.get('created_at')}):")
+    for name, stats in current["endpoints"].items():
+        before = baseline.get("endpoints", {}).get(name)
+        if not before:
+            continue
+        parts = []
+        for metric in ("throughput_per_s", "p50_ms", "p95_ms", "p99_ms"):
+            if stats.get(metric) is not None and before.get(metric):
+                change = (stats[metric] - before[metric]) / before[metric] * 100
+                parts.append(f"{metric} {before[metric]} -> {stats[metric]} ({change:+.1f}%)")
+        print(f"  {name}: " + "; ".join(parts))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=20, help="Concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds of load")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Mean pause between a user's requests")
+    parser.add_argument("--mix", help="Operation weights, e.g. login=5,create_session=5,send=30,list_sessions=60")
+    parser.add_argument("--distinct-prompts", type=int, default=1000, help="Size of the prompt pool for /send")
+    parser.add_argument("--rate-limit", action="store_true", help="Keep the rate limiter enabled")
+    parser.add_argument("--engine", choices=["interpreter", "http"], default="interpreter", help="AI_ENGINE to run")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="Stub LLM seconds to first token")
+    parser.add_argument("--llm-tokens", type=int, default=100, help="Stub LLM tokens per response")
+    parser.add_argument("--llm-tokens-per-second", type=float, default=100.0)
+    parser.add_argument("--output", type=Path, help="Where to write the JSON result")
+    parser.add_argument("--compare", type=Path, help="Earlier JSON result to compare against")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    print(json.dumps(result, indent=2))
+
+    output = args.output or RESULTS_DIR / f"load-{datetime.utcnow():%Y%m%dT%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2))
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        compare(result, json.loads(args.compare.read_text()))
+
+
+if __name__ == "__main__":
+    main()
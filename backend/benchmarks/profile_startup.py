@@ -0,0 +1,104 @@
+"""
+Profile worker start-up imports with `python -X importtime`.
+
+Imports backend.main in a fresh interpreter, reports the total import time
+and the slowest modules by cumulative time, and checks that the heavy AI
+stack (open-interpreter) is not imported until it is first needed. With
+--lifespan it also times the app's lifespan startup (until the worker
+accepts requests) and shutdown against the in-memory database stand-ins.
+
+    python -m backend.benchmarks.profile_startup --top 25
+    python -m backend.benchmarks.profile_startup --lifespan
+"""
+from typing import Dict, List
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+LAZY_MODULES = ("interpreter",)
+
+
+def _import_times(target: str) -> List[Dict]:
+    """Run `import target` under -X importtime and parse its report"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"import {target} failed:\n{result.stderr[-2000:]}")
+
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append({
+            "module": name.strip(),
+            "depth": (len(name) - len(name.lstrip())) // 2,
+            "self_ms": int(self_us) / 1000,
+            "cumulative_ms": int(cumulative_us) / 1000,
+        })
+    return modules
+
+
+def _lifespan_times() -> Dict[str, float]:
+    """Time lifespan startup and shutdown of backend.main against the stand-ins"""
+    # Warm-up would load the AI stack during the measurement
+    os.environ["AI_WARMUP_ENABLED"] = "false"
+    from backend.benchmarks.standins import install_databases
+    from backend.main import app
+
+    install_databases()
+
+    async def run() -> Dict[str, float]:
+        context = app.router.lifespan_context(app)
+        started = time.perf_counter()
+        await context.__aenter__()
+        startup = time.perf_counter() - started
+        started = time.perf_counter()
+        await context.__aexit__(None, None, None)
+        return {
+            "startup_ms": round(startup * 1000, 1),
+            "shutdown_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+
+    return asyncio.run(run())
+
+
+def main(target: str, top: int, lifespan: bool) -> None:
+    modules = _import_times(target)
+    # Top-level entries (depth 0) account for the whole import without double counting
+    total_ms = sum(m["cumulative_ms"] for m in modules if m["depth"] == 0)
+    names = {m["module"] for m in modules}
+    eager = [name for name in LAZY_MODULES if name in names]
+
+    slowest = sorted(modules, key=lambda m: m["cumulative_ms"], reverse=True)[:top]
+    report = {
+        "target": target,
+        "modules_imported": len(modules),
+        "total_import_ms": round(total_ms, 1),
+        "lazy_modules_imported_eagerly": eager,
+        "slowest": [
+            {"module": m["module"], "cumulative_ms": round(m["cumulative_ms"], 1), "self_ms": round(m["self_ms"], 1)}
+            for m in slowest
+        ],
+    }
+    if lifespan:
+        report["lifespan"] = _lifespan_times()
+    print(json.dumps(report, indent=2))
+    if eager:
+        raise SystemExit(f"Expected lazy modules imported at start-up: {', '.join(eager)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--target", default="backend.main", help="Module to import")
+    parser.add_argument("--top", type=int, default=25, help="Slowest modules to list")
+    parser.add_argument("--lifespan", action="store_true", help="Also time lifespan startup and shutdown")
+    args = parser.parse_args()
+    main(args.target, args.top, args.lifespan)
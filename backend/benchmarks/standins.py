@@ -0,0 +1,51 @@
+"""
+Local stand-ins for the service's external dependencies.
+
+MongoDB is replaced by an in-memory Motor-compatible client (mongomock-motor),
+Redis by fakeredis (with Lua scripting for the rate limiter), and the LLM by
+StubLLM served over HTTP. Nothing leaves the machine.
+"""
+from backend.benchmarks.stub_llm import StubLLM, serve_in_thread
+import os
+import socket
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def configure_environment(llm: StubLLM, rate_limit: bool = False, engine: str = "interpreter") -> str:
+    """
+    Start the stub LLM and point the app's settings at the stand-ins.
+
+    Must run before anything from `backend` is imported, because settings are
+    read at import time. Returns the stub LLM's base URL.
+    """
+    import certifi
+
+    port = _free_port()
+    serve_in_thread(llm, port=port)
+    api_base = f"http://127.0.0.1:{port}/v1"
+
+    os.environ["OPENAI_API_BASE"] = api_base
+    os.environ.setdefault("OPENAI_API_KEY", "sk-stub")
+    os.environ["SSL_CA_BUNDLE"] = certifi.where()
+    os.environ["RATE_LIMIT_ENABLED"] = "true" if rate_limit else "false"
+    os.environ["AI_ENGINE"] = engine
+    # The stub speaks plain HTTP/1.1
+    os.environ["LLM_HTTP2"] = "false"
+    return api_base
+
+
+def install_databases(db_name: str = "smartchat_bench") -> None:
+    """Swap MongoDB and RedisClient onto in-memory stand-ins"""
+    from mongomock_motor import AsyncMongoMockClient
+    from fakeredis import aioredis as fake_aioredis
+    from backend.database.mongodb import MongoDB
+    from backend.database.redis import RedisClient
+
+    MongoDB.client = AsyncMongoMockClient()
+    MongoDB.db = MongoDB.client[db_name]
+    RedisClient.redis = fake_aioredis.FakeRedis(decode_responses=True)
@@ -0,0 +1,119 @@
+"""
+OpenAI-compatible stub LLM with configurable latency and token rate.
+
+Serves POST /v1/chat/completions (plain and streaming) so AIService can be
+pointed at it through OPENAI_API_BASE without any network or API spend.
+
+    python -m backend.benchmarks.stub_llm --port 9000 --latency 0.5 --tokens 200 --tokens-per-second 50
+"""
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+import argparse
+import asyncio
+import json
+import threading
+import time
+import uuid
+import uvicorn
+
+
+class StubLLM:
+    """A fake chat completion model"""
+
+    def __init__(self, latency: float = 0.5, tokens: int = 200, tokens_per_second: float = 50.0):
+        self.latency = latency
+        self.tokens = tokens
+        self.tokens_per_second = tokens_per_second
+        self.requests = 0
+
+    def _tokens(self, prompt: str):
+        words = (prompt.split() or ["analysis"])
+        return [f"{words[i % len(words)]} " for i in range(self.tokens)]
+
+    @staticmethod
+    def _prompt(body: dict) -> str:
+        for message in reversed(body.get("messages", [])):
+            if message.get("role") == "user" and isinstance(message.get("content"), str):
+                return message["content"]
+        return ""
+
+    async def chat_completions(self, request: Request):
+        body = await request.json()
+        self.requests += 1
+        model = body.get("model", "stub")
+        tokens = self._tokens(self._prompt(body))
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        created = int(time.time())
+
+        await asyncio.sleep(self.latency)
+
+        if not body.get("stream"):
+            await asyncio.sleep(len(tokens) / self.tokens_per_second)
+            return JSONResponse({
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": "".join(tokens)},
+                    "finish_reason": "stop",
+                }],
+                "usage": {"prompt_tokens": 0, "completion_tokens": len(tokens), "total_tokens": len(tokens)},
+            })
+
+        async def events():
+            for i, token in enumerate(tokens):
+                delta = {"content": token}
+                if i == 0:
+                    delta["role"] = "assistant"
+                chunk = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [{"index": 0, "delta": delta, "finish_reason": None}],
+                }
+                yield f"data: {json.dumps(chunk)}\n\n"
+                await asyncio.sleep(1 / self.tokens_per_second)
+            final = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+            }
+            yield f"data: {json.dumps(final)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    def app(self) -> Starlette:
+        return Starlette(routes=[
+            Route("/v1/chat/completions", self.chat_completions, methods=["POST"]),
+            Route("/chat/completions", self.chat_completions, methods=["POST"]),
+        ])
+
+
+def serve_in_thread(stub: StubLLM, host: str = "127.0.0.1", port: int = 9000) -> uvicorn.Server:
+    """Run the stub in a background thread with its own event loop"""
+    server = uvicorn.Server(uvicorn.Config(stub.app(), host=host, port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency", type=float, default=0.5, help="Seconds before the first token")
+    parser.add_argument("--tokens", type=int, default=200, help="Tokens per response")
+    parser.add_argument("--tokens-per-second", type=float, default=50.0)
+    args = parser.parse_args()
+    stub = StubLLM(args.latency, args.tokens, args.tokens_per_second)
+    uvicorn.run(stub.app(), host=args.host, port=args.port, log_level="info")
@@ -14,13 +14,107 @@ class Settings(BaseSettings):
     # MongoDB settings
     MONGODB_URL: str = os.getenv("MONGODB_URL", "mongodb://localhost:27017")
     MONGODB_DB: str = os.getenv("MONGODB_DB", "smartchat")
+    MONGODB_MAX_POOL_SIZE: int = 10  # Connections per worker
+    
+    # JSON API responses
+    GZIP_MIN_SIZE: int = 1024  # Bytes; smaller responses are sent uncompressed
+    GZIP_LEVEL: int = 5
+
+    # Frontend build, compressed in memory by every worker at startup
+    STATIC_GZIP_LEVEL: int = 6
+    STATIC_BROTLI_QUALITY: int = 5
     
     # Redis settings
     REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379")
     REDIS_TTL: int = 3600  # 1 hour cache TTL
+    REDIS_MAX_CONNECTIONS: int = 50  # Pool size per worker
+    REDIS_POOL_TIMEOUT: float = 5.0  # Seconds to wait for a free pooled connection
+    
+    # Write-behind batching of chat message writes (per worker; unflushed messages are lost on a crash)
+    WRITE_BEHIND_ENABLED: bool = False
+    WRITE_BEHIND_BATCH_SIZE: int = 100  # Buffered messages that trigger a flush
+    WRITE_BEHIND_FLUSH_INTERVAL: float = 0.5  # Seconds between timed flushes
+    MESSAGE_MIGRATION_BATCH_SIZE: int = 100  # Legacy sessions moved to chat_messages per batch at startup
+    
+    # Two-tier (in-process + Redis) caches
+    LAYERED_CACHE_MAX_SIZE: int = 10000  # In-process entries per cache
+    SESSION_OWNER_CACHE_TTL: int = 3600  # Seconds a session's owner stays in Redis
+    SESSION_OWNER_LOCAL_TTL: float = 300.0  # Seconds it stays in each worker's memory
+    
+    # Password hashing
+    PASSWORD_HASH_WORKERS: int = 2  # bcrypt worker processes per uvicorn worker
+    PASSWORD_HASH_MAX_QUEUE: int = 32  # Waiting hash operations before failing fast with 503
+    PASSWORD_HASH_QUEUE_TIMEOUT: float = 5.0  # Seconds a hash operation may wait for a worker
+    
+    # Authenticated user cache
+    USER_CACHE_TTL: int = 60  # Seconds a cached user document stays valid
+    USER_CACHE_MAX_SIZE: int = 10000
+    
+    # LLM endpoint
+    OPENAI_API_BASE: str = ""  # Empty uses the provider default; set to target a compatible endpoint
+    SSL_CA_BUNDLE: str = "/app/backend/certs/cert.crt"
+    
+    # AI engine: "interpreter" (Open Interpreter, can run code) or "http" (plain chat over pooled async HTTP)
+    AI_ENGINE: str = "interpreter"
+    AI_WARMUP_ENABLED: bool = True  # Load the AI stack in the background once the worker is serving
+    AI_WARMUP_DELAY: float = 1.0  # Seconds after startup before warming up
+    LLM_HTTP2: bool = True
+    LLM_MAX_CONNECTIONS: int = 200
+    LLM_MAX_KEEPALIVE_CONNECTIONS: int = 50
+    LLM_KEEPALIVE_EXPIRY: float = 60.0
+    LLM_CONNECT_TIMEOUT: float = 10.0
+    LLM_READ_TIMEOUT: float = 120.0
+    LLM_POOL_TIMEOUT: float = 30.0  # Seconds to wait for a free connection
+    
+    # AI interpreter pool
+    INTERPRETER_POOL_SIZE: int = 10  # Max resident interpreters (and AI worker threads)
+    INTERPRETER_IDLE_TIMEOUT: int = 900  # Seconds before an idle session's interpreter is evicted
+    
+    # AI admission control: the executor's queue is bounded and shared fairly between users
+    AI_QUEUE_MAX_SIZE: int = 50  # Waiting AI requests per worker before rejecting with 503
+    AI_QUEUE_MAX_PER_USER: int = 3  # Waiting AI requests per user before rejecting with 429
+    AI_QUEUE_MAX_WAIT: float = 30.0  # Seconds a request may wait for a slot before 503
+    AI_QUEUE_RETRY_AFTER: int = 5  # Retry-After seconds sent with rejections
+    AI_PRIORITY_USER_IDS: List[str] = []  # Users served ahead of everyone else
+    
+    # Conversation context
+    CONTEXT_TOKEN_BUDGET: int = 3000  # Tokens of history sent verbatim with each message
+    CONTEXT_SUMMARY_MAX_WORDS: int = 300  # Target length of the rolling conversation summary
+    
+    # Chat history search
+    SEARCH_MAX_CANDIDATES: int = 500  # Best-scoring hits read per collection per search
+    SEARCH_MATCHES_PER_SESSION: int = 3  # Snippets returned per matching session
+    SEARCH_SNIPPET_CHARS: int = 160
+    
+    # Chat history export
+    EXPORT_BATCH_SIZE: int = 500  # Documents fetched per cursor round trip
+    EXPORT_CHUNK_BYTES: int = 64 * 1024  # Encoded bytes buffered before each write to the client
+    EXPORT_GZIP_LEVEL: int = 6
+    RATE_LIMIT_EXPORT_PER_MINUTE: int = 5  # GET /api/chat/export, per user
+    
+    # AI response cache
+    AI_CACHE_ENABLED: bool = True
+    AI_CACHE_TTL: int = 86400  # 24 hours
+    AI_CACHE_MAX_ENTRIES: int = 10000
+    AI_CACHE_MAX_RESPONSE_BYTES: int = 64 * 1024  # Larger responses are not cached
+    
+    # Coalescing of identical in-flight AI requests
+    SINGLEFLIGHT_ENABLED: bool = True
+    SINGLEFLIGHT_LOCK_TTL: int = 120  # Seconds a cross-worker leader lock is held at most
+    SINGLEFLIGHT_WAIT_TIMEOUT: float = 120.0  # Seconds a follower waits before computing itself
+    
+    # Readiness checks
+    HEALTH_PROBE_INTERVAL: float = 10.0  # Seconds between background dependency probes
+    HEALTH_PROBE_TIMEOUT: float = 2.0
+    READINESS_MAX_POOL_WAITERS: int = 10  # Requests queued for a Mongo or Redis connection before not ready
+    READINESS_MAX_AI_QUEUE_RATIO: float = 0.8  # AI queue fill level (of AI_QUEUE_MAX_SIZE) before not ready
     
     # Rate limiting
-    RATE_LIMIT_PER_MINUTE: int = 100
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_PER_MINUTE: int = 100  # Per authenticated user
+    RATE_LIMIT_IP_PER_MINUTE: int = 300  # Per client IP for unauthenticated requests
+    RATE_LIMIT_SEND_PER_MINUTE: int = 20  # POST /api/chat/{session_id}/send, per user
+    RATE_LIMIT_LOGIN_PER_MINUTE: int = 10  # POST /api/auth/login, per IP
     
     # Email settings
     SMTP_SERVER: str = os.getenv("SMTP_SERVER", "smtp.gmail.com")
@@ -28,6 +122,17 @@ class Settings(BaseSettings):
     SMTP_USERNAME: str = os.getenv("SMTP_USERNAME", "your-email@gmail.com")
     SMTP_PASSWORD: str = os.getenv("SMTP_PASSWORD", "your-app-password")
     SMTP_TLS: bool = True
+    SMTP_AUTH: bool = True  # Turn off (with SMTP_TLS) for a local SMTP sink
+    SMTP_FROM: str = os.getenv("SMTP_FROM", "")  # Defaults to SMTP_USERNAME
+    
+    # Email delivery worker
+    MAIL_BATCH_SIZE: int = 20  # Emails sent per SMTP session checkout
+    MAIL_MAX_ATTEMPTS: int = 5
+    MAIL_RETRY_BASE_DELAY: float = 30.0  # Seconds before the first retry; doubles each attempt
+    MAIL_RETRY_MAX_DELAY: float = 3600.0
+    MAIL_CONNECTION_IDLE: float = 60.0  # Seconds an idle SMTP session is kept open
+    MAIL_SMTP_TIMEOUT: float = 30.0
+    MAIL_SHUTDOWN_TIMEOUT: float = 10.0  # Seconds to let an in-progress batch finish
     
     # Frontend URL for password reset
     FRONTEND_URL: str = os.getenv("FRONTEND_URL", "http://localhost:8000")
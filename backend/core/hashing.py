@@ -0,0 +1,99 @@
+from concurrent.futures import ProcessPoolExecutor
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+from backend.core.config import settings
+from backend.core.metrics import PASSWORD_HASH_DURATION, PASSWORD_HASH_QUEUE_WAIT
+from typing import Optional
+import asyncio
+import logging
+import multiprocessing
+import time
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt in a bounded process pool so hashing never blocks the event loop.
+
+    At most PASSWORD_HASH_WORKERS operations run at once; up to
+    PASSWORD_HASH_MAX_QUEUE more wait for a slot. Anything beyond that, or
+    anything that waits longer than PASSWORD_HASH_QUEUE_TIMEOUT, fails fast
+    with 503 instead of piling up behind a login burst.
+    """
+
+    _executor: Optional[ProcessPoolExecutor] = None
+    _slots: Optional[asyncio.Semaphore] = None
+    _waiting = 0
+
+    @classmethod
+    def start(cls) -> None:
+        """Start the hashing process pool"""
+        if cls._executor is None:
+            # Spawned workers don't inherit the event loop, sockets or locks of this process
+            cls._executor = ProcessPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            cls._slots = asyncio.Semaphore(settings.PASSWORD_HASH_WORKERS)
+            logging.info(f"Started password hashing pool with {settings.PASSWORD_HASH_WORKERS} workers")
+
+    @classmethod
+    def shutdown(cls) -> None:
+        """Stop the hashing process pool"""
+        if cls._executor is not None:
+            cls._executor.shutdown(wait=False, cancel_futures=True)
+            cls._executor = None
+            cls._slots = None
+            logging.info("Password hashing pool stopped")
+
+    @classmethod
+    async def _run(cls, operation: str, func, *args):
+        if cls._executor is None:
+            cls.start()
+
+        if cls._waiting >= settings.PASSWORD_HASH_MAX_QUEUE:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please try again",
+                headers={"Retry-After": "1"},
+            )
+
+        cls._waiting += 1
+        queued = time.perf_counter()
+        try:
+            await asyncio.wait_for(cls._slots.acquire(), timeout=settings.PASSWORD_HASH_QUEUE_TIMEOUT)
+        except asyncio.TimeoutError:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please try again",
+                headers={"Retry-After": "1"},
+            )
+        finally:
+            cls._waiting -= 1
+
+        started = time.perf_counter()
+        PASSWORD_HASH_QUEUE_WAIT.observe(started - queued)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(cls._executor, func, *args)
+        finally:
+            cls._slots.release()
+            PASSWORD_HASH_DURATION.labels(operation).observe(time.perf_counter() - started)
+
+    @classmethod
+    async def hash(cls, password: str) -> str:
+        """Hash a password"""
+        return await cls._run("hash", _hash, password)
+
+    @classmethod
+    async def verify(cls, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password against its hash"""
+        return await cls._run("verify", _verify, plain_password, hashed_password)
@@ -0,0 +1,120 @@
+from backend.core.config import settings
+from backend.database.mongodb import MongoDB
+from backend.database.redis import RedisClient
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+import asyncio
+import logging
+import time
+
+
+class HealthMonitor:
+    """
+    Background dependency probes and saturation checks for readiness.
+
+    MongoDB and Redis are pinged every HEALTH_PROBE_INTERVAL seconds by one
+    task per worker and the results are cached, so readiness requests cost
+    nothing however often the load balancer polls. A worker reports not
+    ready when the MongoDB probe fails or goes stale, or when it is
+    saturated: too many requests waiting for a Mongo or Redis connection, or
+    the AI queue close to full. Traffic then goes to other replicas until it
+    drains. A failed Redis probe only marks the worker "degraded".
+    """
+
+    # Dependencies whose failure takes the worker out of rotation
+    REQUIRED = ("mongodb",)
+    _probes: Dict[str, Dict[str, Any]] = {}
+    _task: Optional[asyncio.Task] = None
+
+    @classmethod
+    async def _probe(cls, name: str, ping: Callable[[], Awaitable[bool]]) -> None:
+        started = time.perf_counter()
+        try:
+            healthy = await asyncio.wait_for(ping(), timeout=settings.HEALTH_PROBE_TIMEOUT)
+        except asyncio.TimeoutError:
+            healthy = False
+        if not healthy and cls._probes.get(name, {}).get("healthy", True):
+            logging.warning(f"Readiness probe for {name} failed")
+        cls._probes[name] = {
+            "healthy": healthy,
+            "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+            "checked_at": time.time(),
+        }
+
+    @classmethod
+    async def probe_all(cls) -> None:
+        """Probe every dependency once"""
+        await asyncio.gather(
+            cls._probe("mongodb", MongoDB.ping),
+            cls._probe("redis", RedisClient.ping),
+        )
+
+    @classmethod
+    async def _run(cls) -> None:
+        while True:
+            try:
+                await cls.probe_all()
+            except Exception as e:
+                logging.error(f"Readiness probe error: {str(e)}")
+            await asyncio.sleep(settings.HEALTH_PROBE_INTERVAL)
+
+    @classmethod
+    async def start(cls) -> None:
+        """Start probing in the background; readiness fails until the first probes finish"""
+        if cls._task is None:
+            cls._task = asyncio.create_task(cls._run())
+
+    @classmethod
+    async def stop(cls) -> None:
+        """Stop the background probes"""
+        if cls._task is not None:
+            cls._task.cancel()
+            try:
+                await cls._task
+            except asyncio.CancelledError:
+                pass
+            cls._task = None
+
+    @staticmethod
+    def _ai_queue() -> Dict[str, int]:
+        from backend.services.ai_service import AIService
+
+        if AIService._instance is None:
+            return {"active": 0, "waiting": 0, "max_waiting": settings.AI_QUEUE_MAX_SIZE}
+        stats = AIService._instance.scheduler.stats()
+        return {**stats, "max_waiting": AIService._instance.scheduler.max_queue}
+
+    @classmethod
+    def readiness(cls) -> Tuple[bool, Dict[str, Any]]:
+        """Whether this worker should receive traffic, with the numbers behind the answer"""
+        reasons = []
+        degraded = []
+        stale_after = settings.HEALTH_PROBE_INTERVAL * 3
+        for name in ("mongodb", "redis"):
+            probe = cls._probes.get(name)
+            if probe is None or not probe["healthy"]:
+                problem = f"{name} unavailable"
+            elif time.time() - probe["checked_at"] > stale_after:
+                problem = f"{name} probe stale"
+            else:
+                continue
+            # Every Redis-backed feature falls back without it, so only MongoDB is required
+            (reasons if name in cls.REQUIRED else degraded).append(problem)
+
+        pools = {"mongodb": MongoDB.pool_stats(), "redis": RedisClient.pool_stats()}
+        for name, pool in pools.items():
+            if pool["waiting"] > settings.READINESS_MAX_POOL_WAITERS:
+                reasons.append(f"{name} pool saturated")
+
+        ai_queue = cls._ai_queue()
+        if ai_queue["waiting"] >= ai_queue["max_waiting"] * settings.READINESS_MAX_AI_QUEUE_RATIO:
+            reasons.append("AI queue saturated")
+
+        ready = not reasons
+        return ready, {
+            "status": "not_ready" if reasons else "degraded" if degraded else "ready",
+            "reasons": reasons,
+            "degraded": degraded,
+            "dependencies": cls._probes,
+            "pools": pools,
+            "ai_queue": ai_queue,
+        }
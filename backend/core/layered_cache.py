@@ -0,0 +1,208 @@
+from collections import OrderedDict
+from backend.core.config import settings
+from backend.core.metrics import LAYERED_CACHE_LOOKUPS
+from backend.database.redis import PubSubListener, RedisClient
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+import asyncio
+import json
+import logging
+import math
+import random
+import time
+import uuid
+
+class LayeredCache:
+    """
+    Read-through cache with a per-worker LRU/TTL tier (L1) over Redis (L2).
+
+    `get_or_load` answers from L1 without any I/O, then from Redis, and only
+    then calls the loader. Misses are coalesced within a worker, and across
+    workers a short Redis lock lets one caller recompute while the others
+    poll Redis for its result. Redis entries also record how long they took
+    to compute, so callers refresh them probabilistically just before expiry
+    (XFetch), spreading recomputation out instead of stampeding when a hot
+    key expires. `invalidate` drops a key everywhere, broadcasting to every
+    worker's L1 over pub/sub.
+
+    Values must be JSON-serializable; None is never cached.
+    """
+
+    channel = "layered_cache:invalidate"
+    _namespaces: Dict[str, "LayeredCache"] = {}
+    _listener: Optional[PubSubListener] = None
+
+    def __init__(
+        self,
+        namespace: str,
+        ttl: int,
+        local_ttl: float,
+        max_size: int = settings.LAYERED_CACHE_MAX_SIZE,
+        beta: float = 1.0,
+        lock_timeout: float = 5.0
+    ):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.local_ttl = local_ttl
+        self.max_size = max_size
+        self.beta = beta
+        self.lock_timeout = lock_timeout
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._loading: Dict[str, asyncio.Future] = {}
+        self._namespaces[namespace] = self
+
+    def _redis_key(self, key: str) -> str:
+        return f"cache:{self.namespace}:{key}"
+
+    def _get_local(self, key: str) -> Tuple[bool, Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        if entry[0] < time.monotonic():
+            del self._entries[key]
+            return False, None
+        self._entries.move_to_end(key)
+        return True, entry[1]
+
+    def _set_local(self, key: str, value: Any, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + min(ttl, self.local_ttl), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def discard(self, key: str) -> None:
+        """Drop a key from this worker's L1"""
+        self._entries.pop(key, None)
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Get a value, computing and caching it with loader on a miss"""
+        found, value = self._get_local(key)
+        if found:
+            LAYERED_CACHE_LOOKUPS.labels(self.namespace, "l1").inc()
+            return value
+
+        future = self._loading.get(key)
+        if future is not None:
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._loading[key] = future
+        try:
+            value = await self._get_shared_or_load(key, loader)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            # Retrieve the exception so an unwatched future does not warn
+            future.exception()
+            raise
+        finally:
+            self._loading.pop(key, None)
+
+    async def _read_shared(self, key: str) -> Optional[Dict[str, Any]]:
+        raw = await RedisClient.get_cache(self._redis_key(key))
+        return json.loads(raw) if raw is not None else None
+
+    def _should_refresh_early(self, entry: Dict[str, Any]) -> bool:
+        # XFetch: refresh with rising probability as expiry nears, scaled by compute time
+        return time.time() - entry["delta"] * self.beta * math.log(1 - random.random()) >= entry["expires"]
+
+    async def _get_shared_or_load(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        entry = await self._read_shared(key)
+        if entry is not None and not self._should_refresh_early(entry):
+            LAYERED_CACHE_LOOKUPS.labels(self.namespace, "l2").inc()
+            self._set_local(key, entry["value"], entry["expires"] - time.time())
+            return entry["value"]
+
+        if entry is not None:
+            # Refreshing early: one caller recomputes while everyone else keeps the current value
+            LAYERED_CACHE_LOOKUPS.labels(self.namespace, "refresh").inc()
+            token = await self._try_lock(key)
+            if token is None:
+                self._set_local(key, entry["value"], entry["expires"] - time.time())
+                return entry["value"]
+            return await self._load_and_store(key, loader, token)
+
+        LAYERED_CACHE_LOOKUPS.labels(self.namespace, "miss").inc()
+        token = await self._try_lock(key)
+        if token is None:
+            # Someone else is computing it; wait for their result rather than piling on
+            deadline = time.monotonic() + self.lock_timeout
+            while time.monotonic() < deadline:
+                await asyncio.sleep(0.05)
+                entry = await self._read_shared(key)
+                if entry is not None:
+                    self._set_local(key, entry["value"], entry["expires"] - time.time())
+                    return entry["value"]
+        return await self._load_and_store(key, loader, token)
+
+    async def _try_lock(self, key: str) -> Optional[str]:
+        """Take the recompute lock; returns its token, or "" if Redis is unavailable"""
+        if not RedisClient.redis:
+            return ""
+        token = uuid.uuid4().hex
+        try:
+            acquired = await RedisClient.redis.set(
+                f"{self._redis_key(key)}:lock", token, nx=True, px=int(self.lock_timeout * 1000)
+            )
+        except Exception as e:
+            logging.error(f"Cache lock error: {str(e)}")
+            return ""
+        return token if acquired else None
+
+    async def _load_and_store(self, key: str, loader: Callable[[], Awaitable[Any]], token: Optional[str]) -> Any:
+        started = time.time()
+        try:
+            value = await loader()
+            if value is not None:
+                now = time.time()
+                entry = {"value": value, "delta": now - started, "expires": now + self.ttl}
+                await RedisClient.set_cache(self._redis_key(key), json.dumps(entry), ttl=self.ttl)
+                self._set_local(key, value, self.ttl)
+            return value
+        finally:
+            if token:
+                await self._unlock(key, token)
+
+    async def _unlock(self, key: str, token: str) -> None:
+        try:
+            await RedisClient.release_lock(f"{self._redis_key(key)}:lock", token)
+        except Exception as e:
+            logging.error(f"Cache unlock error: {str(e)}")
+
+    async def invalidate(self, key: str) -> None:
+        """Drop a key from Redis and from every worker's L1"""
+        self.discard(key)
+        await RedisClient.delete_cache(self._redis_key(key))
+        if RedisClient.redis:
+            try:
+                await RedisClient.redis.publish(self.channel, json.dumps([self.namespace, key]))
+            except Exception as e:
+                logging.error(f"Cache invalidation publish error: {str(e)}")
+
+    @classmethod
+    def _on_invalidate(cls, data: str) -> None:
+        namespace, key = json.loads(data)
+        cache = cls._namespaces.get(namespace)
+        if cache is not None:
+            cache.discard(key)
+
+    @classmethod
+    def _clear_all(cls) -> None:
+        for cache in cls._namespaces.values():
+            cache._entries.clear()
+
+    @classmethod
+    async def start_listener(cls) -> None:
+        """Start listening for invalidations from other workers"""
+        if cls._listener is None:
+            cls._listener = PubSubListener(cls.channel, cls._on_invalidate, cls._clear_all)
+        await cls._listener.start()
+
+    @classmethod
+    async def stop_listener(cls) -> None:
+        """Stop the invalidation listener"""
+        if cls._listener is not None:
+            await cls._listener.stop()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"namespace": self.namespace, "size": len(self._entries), "max_size": self.max_size}
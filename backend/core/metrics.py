@@ -0,0 +1,237 @@
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    REGISTRY,
+    generate_latest,
+)
+from prometheus_client import multiprocess
+from pymongo import monitoring
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+import os
+import time
+
+# With several uvicorn workers set PROMETHEUS_MULTIPROC_DIR (an empty, writable
+# directory) so a scrape of any worker reports the sum across all of them.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+MONGO_OPERATION_DURATION = Histogram(
+    "mongodb_operation_duration_seconds",
+    "MongoDB command latency",
+    ["command"],
+    buckets=LATENCY_BUCKETS,
+)
+MONGO_POOL_IN_USE = Gauge(
+    "mongodb_pool_connections_in_use",
+    "MongoDB connections checked out of the pool",
+    multiprocess_mode="livesum",
+)
+MESSAGE_FLUSH_SIZE = Histogram(
+    "chat_message_flush_size",
+    "Chat messages written per write-behind flush",
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+REDIS_OPERATION_DURATION = Histogram(
+    "redis_operation_duration_seconds",
+    "Redis command latency",
+    ["operation"],
+    buckets=LATENCY_BUCKETS,
+)
+REDIS_POOL_WAIT = Histogram(
+    "redis_pool_wait_seconds",
+    "Time spent waiting for a pooled Redis connection",
+    buckets=LATENCY_BUCKETS,
+)
+REDIS_POOL_IN_USE = Gauge(
+    "redis_pool_connections_in_use",
+    "Redis connections checked out of the pool",
+    multiprocess_mode="livesum",
+)
+AI_QUEUE_WAIT = Histogram(
+    "ai_executor_queue_wait_seconds",
+    "Time AI requests wait for an executor slot",
+    buckets=LATENCY_BUCKETS,
+)
+AI_EXECUTION_DURATION = Histogram(
+    "ai_execution_duration_seconds",
+    "Time spent generating an AI response once running",
+    ["mode"],
+    buckets=LATENCY_BUCKETS,
+)
+AI_EXECUTOR_QUEUED = Gauge(
+    "ai_executor_queued",
+    "AI requests waiting for an executor slot",
+    multiprocess_mode="livesum",
+)
+AI_EXECUTOR_ACTIVE = Gauge(
+    "ai_executor_active",
+    "AI requests currently running on an executor thread",
+    multiprocess_mode="livesum",
+)
+AI_ADMISSION_REJECTED = Counter(
+    "ai_admission_rejected_total",
+    "AI requests turned away by admission control",
+    ["reason"],
+)
+AI_CACHE_LOOKUPS = Counter(
+    "ai_response_cache_lookups_total",
+    "AI response cache lookups",
+    ["result"],
+)
+AI_CACHE_ENTRIES = Gauge(
+    "ai_response_cache_entries",
+    "AI response cache entries in Redis, as of the last write",
+    multiprocess_mode="max",
+)
+AI_SINGLEFLIGHT_CALLS = Counter(
+    "ai_singleflight_calls_total",
+    "AI requests by coalescing role: leader made the LLM call, local/remote joined one",
+    ["role"],
+)
+MAIL_DELIVERIES = Counter(
+    "mail_deliveries_total",
+    "Email delivery attempts by outcome: sent, retried or dead",
+    ["result"],
+)
+LAYERED_CACHE_LOOKUPS = Counter(
+    "layered_cache_lookups_total",
+    "Two-tier cache lookups by where they were answered: l1, l2, refresh or miss",
+    ["cache", "tier"],
+)
+USER_CACHE_LOOKUPS = Counter(
+    "user_cache_lookups_total",
+    "Authenticated user cache lookups",
+    ["result"],
+)
+USER_CACHE_ENTRIES = Gauge(
+    "user_cache_entries",
+    "Authenticated users cached in worker memory",
+    multiprocess_mode="livesum",
+)
+USER_CACHE_EVICTIONS = Counter(
+    "user_cache_evictions_total",
+    "Cached users evicted to stay under the size limit",
+)
+PASSWORD_HASH_DURATION = Histogram(
+    "password_hash_duration_seconds",
+    "bcrypt hash/verify duration including process pool hand-off",
+    ["operation"],
+    buckets=LATENCY_BUCKETS,
+)
+PASSWORD_HASH_QUEUE_WAIT = Histogram(
+    "password_hash_queue_wait_seconds",
+    "Time password hashing waits for a free worker",
+    buckets=LATENCY_BUCKETS,
+)
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    """Times every MongoDB command"""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        MONGO_OPERATION_DURATION.labels(event.command_name).observe(event.duration_micros / 1e6)
+
+    def failed(self, event):
+        MONGO_OPERATION_DURATION.labels(event.command_name).observe(event.duration_micros / 1e6)
+
+
+class MongoPoolListener(monitoring.ConnectionPoolListener):
+    """Tracks how many pooled MongoDB connections are checked out or being waited for"""
+
+    # This worker's counts, for the readiness check
+    in_use = 0
+    waiting = 0
+
+    def connection_checked_out(self, event):
+        MongoPoolListener.in_use += 1
+        MongoPoolListener.waiting -= 1
+        MONGO_POOL_IN_USE.inc()
+
+    def connection_checked_in(self, event):
+        MongoPoolListener.in_use -= 1
+        MONGO_POOL_IN_USE.dec()
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        pass
+
+    def connection_check_out_started(self, event):
+        MongoPoolListener.waiting += 1
+
+    def connection_check_out_failed(self, event):
+        MongoPoolListener.waiting -= 1
+
+
+class MetricsMiddleware:
+    """Records request latency labelled by the matched route template"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.labels(
+                scope["method"],
+                route.path if route is not None else "unmatched",
+                str(status_code),
+            ).observe(time.perf_counter() - started)
+
+
+def render_metrics():
+    """Render metrics in the Prometheus text format"""
+    registry = REGISTRY
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_worker_dead():
+    """Drop this worker's live gauge samples from the shared multiprocess directory"""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(os.getpid())
@@ -0,0 +1,189 @@
+from collections import OrderedDict
+from jose import JWTError, jwt
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+from backend.core.config import settings
+from backend.database.redis import RedisClient
+from typing import Dict, List, Optional, Tuple
+import logging
+import math
+import re
+import time
+import uuid
+
+# Sliding-window log over all KEYS at once: the request is admitted only if
+# every window has room, and is then recorded in all of them. Time comes from
+# the Redis server so every worker and replica shares one clock.
+SLIDING_WINDOW_LUA = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local window = tonumber(ARGV[1])
+local member = ARGV[2]
+local retry = 0
+local remaining = -1
+for i, key in ipairs(KEYS) do
+    local limit = tonumber(ARGV[i + 2])
+    redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+    local count = redis.call('ZCARD', key)
+    if count >= limit then
+        local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+        local wait = window - (now - tonumber(oldest[2]))
+        if wait > retry then retry = wait end
+    else
+        local left = limit - count - 1
+        if remaining < 0 or left < remaining then remaining = left end
+    end
+end
+if retry > 0 then
+    return {0, 0, retry}
+end
+for i, key in ipairs(KEYS) do
+    redis.call('ZADD', key, now, member)
+    redis.call('PEXPIRE', key, window)
+end
+return {1, remaining, 0}
+"""
+
+# (method, path pattern, limit per minute, keyed by "user" or "ip")
+ROUTE_RATE_LIMITS: List[Tuple[str, re.Pattern, int, str]] = [
+    ("POST", re.compile(r"^/api/chat/[^/]+/send$"), settings.RATE_LIMIT_SEND_PER_MINUTE, "user"),
+    ("POST", re.compile(r"^/api/auth/login$"), settings.RATE_LIMIT_LOGIN_PER_MINUTE, "ip"),
+    ("GET", re.compile(r"^/api/chat/export$"), settings.RATE_LIMIT_EXPORT_PER_MINUTE, "user"),
+]
+
+EXEMPT_PATHS = {"/api/health", "/api/health/live", "/api/health/ready"}
+
+
+class TokenBucket:
+    """In-process token bucket that turns away clients already over their limit"""
+
+    def __init__(self, capacity: int, window: float):
+        self.capacity = capacity
+        self.rate = capacity / window
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def take(self) -> float:
+        """Take a token; returns 0 on success or the seconds to wait"""
+        now = time.monotonic()
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens < 1:
+            return (1 - self.tokens) / self.rate
+        self.tokens -= 1
+        return 0.0
+
+
+class RateLimitMiddleware:
+    """
+    Enforces per-user, per-IP and per-route request budgets.
+
+    Limits are shared across all workers and replicas through an atomic Redis
+    sliding window. A local token bucket per key sits in front of it, so a
+    client that is already over its limit is rejected without a Redis round
+    trip. If Redis is unavailable requests are allowed through.
+    """
+
+    window_seconds = 60
+    max_local_buckets = 10000
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._script = None
+
+    def _client_ip(self, scope: Scope) -> str:
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    def _user_subject(self, scope: Scope) -> Optional[str]:
+        for name, value in scope.get("headers", []):
+            if name == b"authorization":
+                scheme, _, token = value.decode("latin-1").partition(" ")
+                if scheme.lower() != "bearer" or not token:
+                    return None
+                try:
+                    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+                except JWTError:
+                    return None
+                return payload.get("sub")
+        return None
+
+    def _limits_for(self, scope: Scope) -> Dict[str, int]:
+        """Map each rate-limit key that applies to this request to its per-minute limit"""
+        path = scope["path"]
+        ip = self._client_ip(scope)
+        subject = self._user_subject(scope)
+        identity = f"user:{subject}" if subject else f"ip:{ip}"
+
+        limits = {
+            f"rate:{identity}": settings.RATE_LIMIT_PER_MINUTE if subject else settings.RATE_LIMIT_IP_PER_MINUTE
+        }
+        for method, pattern, limit, key_by in ROUTE_RATE_LIMITS:
+            if scope["method"] == method and pattern.match(path):
+                route_identity = f"ip:{ip}" if key_by == "ip" else identity
+                limits[f"rate:{method}:{pattern.pattern}:{route_identity}"] = limit
+        return limits
+
+    def _bucket(self, key: str, limit: int) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(limit, self.window_seconds)
+            self._buckets[key] = bucket
+            if len(self._buckets) > self.max_local_buckets:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        return bucket
+
+    async def _check_redis(self, limits: Dict[str, int]) -> float:
+        """Record the request in the shared windows; returns 0 if allowed or the seconds to wait"""
+        if not RedisClient.redis:
+            return 0.0
+        try:
+            if self._script is None:
+                self._script = RedisClient.redis.register_script(SLIDING_WINDOW_LUA)
+            allowed, _, retry_ms = await self._script(
+                keys=list(limits),
+                args=[self.window_seconds * 1000, uuid.uuid4().hex, *limits.values()]
+            )
+            return 0.0 if allowed else int(retry_ms) / 1000
+        except Exception as e:
+            logging.error(f"Rate limiter Redis error: {str(e)}")
+            return 0.0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or not settings.RATE_LIMIT_ENABLED
+            or not scope["path"].startswith("/api/")
+            or scope["path"] in EXEMPT_PATHS
+            or scope["method"] == "OPTIONS"
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        limits = self._limits_for(scope)
+
+        retry_after = max(self._bucket(key, limit).take() for key, limit in limits.items())
+        if not retry_after:
+            retry_after = await self._check_redis(limits)
+            if retry_after:
+                blocked_until = time.monotonic() + retry_after
+                for key, limit in limits.items():
+                    bucket = self._bucket(key, limit)
+                    bucket.blocked_until = max(bucket.blocked_until, blocked_until)
+
+        if retry_after:
+            response = JSONResponse(
+                status_code=429,
+                content={"detail": "Rate limit exceeded"},
+                headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+            )
+            await response(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
@@ -0,0 +1,67 @@
+from pydantic import BaseModel
+from starlette.background import BackgroundTask
+from starlette.requests import Request
+from starlette.responses import Response
+from backend.core.config import settings
+from datetime import datetime
+from typing import Any, Dict, Optional
+import gzip
+import json
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the standard library encoder
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize content (including Pydantic models and datetimes) to JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def accepts_gzip(request: Request) -> bool:
+    for part in request.headers.get("accept-encoding", "").split(","):
+        token, _, params = part.strip().partition(";")
+        if token.strip().lower() in ("gzip", "*"):
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+class FastJSONResponse(Response):
+    """
+    JSON response that serializes already-validated models exactly once.
+
+    Routes returning it skip FastAPI's response_model re-validation and
+    jsonable_encoder pass; content is encoded with orjson when available.
+    Bodies of at least GZIP_MIN_SIZE bytes are gzipped for clients that
+    accept it.
+    """
+
+    media_type = "application/json"
+
+    def __init__(
+        self,
+        content: Any,
+        request: Optional[Request] = None,
+        status_code: int = 200,
+        headers: Optional[Dict[str, str]] = None,
+        background: Optional[BackgroundTask] = None
+    ):
+        headers = dict(headers or {})
+        body = dumps(content)
+        if len(body) >= settings.GZIP_MIN_SIZE:
+            headers["Vary"] = "Accept-Encoding"
+            if request is not None and accepts_gzip(request):
+                body = gzip.compress(body, compresslevel=settings.GZIP_LEVEL)
+                headers["Content-Encoding"] = "gzip"
+        super().__init__(body, status_code=status_code, headers=headers, background=background)
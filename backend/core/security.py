@@ -5,6 +5,7 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from backend.core.config import settings
 from backend.database.mongodb import MongoDB
+from backend.core.user_cache import UserCache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
 
@@ -32,9 +33,14 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
     except JWTError:
         raise credentials_exception
 
+    user = UserCache.get(email)
+    if user is not None:
+        return user
+
     users_collection = await MongoDB.get_collection("users")
     user = await users_collection.find_one({"email": email})
     
     if user is None:
         raise credentials_exception
+    UserCache.set(email, user)
     return user
\ No newline at end of file
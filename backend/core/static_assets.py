@@ -0,0 +1,189 @@
+from starlette.requests import Request
+from starlette.responses import FileResponse, Response
+from backend.core.config import settings
+from typing import Dict, List, Optional
+import asyncio
+import gzip
+import hashlib
+import logging
+import mimetypes
+import os
+import re
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+# Vite emits content-hashed bundles such as assets/index-4f9c2a1b.js
+HASHED_ASSET = re.compile(r"^assets/.+[-.][A-Za-z0-9_-]{8,}\.[A-Za-z0-9]+$")
+COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json", "image/svg+xml", "application/xml")
+MIN_COMPRESS_SIZE = 1024
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+SHORT_LIVED = "public, max-age=3600"
+
+
+class _Variant:
+    __slots__ = ("body", "etag")
+
+    def __init__(self, body: bytes, etag: str):
+        self.body = body
+        self.etag = etag
+
+
+class _Asset:
+    __slots__ = ("content_type", "cache_control", "variants")
+
+    def __init__(self, content_type: str, cache_control: str, variants: Dict[str, _Variant]):
+        self.content_type = content_type
+        self.cache_control = cache_control
+        self.variants = variants
+
+
+class StaticAssets:
+    """
+    In-memory frontend build with precompressed variants.
+
+    `load` reads the build output once at startup and stores each file with
+    gzip (and, when the brotli package is installed, br) variants, each with
+    its own strong ETag. Requests are then answered from memory: the best
+    variant for Accept-Encoding, 304 on a matching If-None-Match, and
+    year-long immutable caching for Vite's content-hashed bundles. index.html
+    is always revalidated so new deploys are picked up.
+
+    Until `load` has finished, files are served uncompressed straight from
+    the directory given to `serve`, so startup does not wait on compression.
+    """
+
+    _assets: Dict[str, _Asset] = {}
+    _directory: Optional[str] = None
+    _loaded = False
+
+    @classmethod
+    def serve(cls, directory: str) -> None:
+        """Serve the build directory from disk until it is loaded"""
+        cls._directory = directory
+
+    @classmethod
+    async def load(cls) -> None:
+        """Load and precompress every file under the build directory"""
+        if cls._directory is None:
+            return
+        # Compression is CPU-bound; keep it off the event loop
+        await asyncio.to_thread(cls._load, cls._directory)
+        cls._loaded = True
+
+    @classmethod
+    def _load(cls, directory: str) -> None:
+        assets: Dict[str, _Asset] = {}
+        total = 0
+        for root, _, files in os.walk(directory):
+            for name in files:
+                full_path = os.path.join(root, name)
+                path = os.path.relpath(full_path, directory).replace(os.sep, "/")
+                with open(full_path, "rb") as f:
+                    body = f.read()
+                assets[path] = cls._build(path, body)
+                total += len(body)
+        cls._assets = assets
+        logging.info(f"Loaded {len(assets)} static files ({total} bytes) into memory")
+
+    @classmethod
+    def _build(cls, path: str, body: bytes) -> _Asset:
+        content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        if content_type.startswith("text/") or content_type == "application/javascript":
+            content_type += "; charset=utf-8"
+
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        variants = {"identity": _Variant(body, f'"{digest}"')}
+        if len(body) >= MIN_COMPRESS_SIZE and content_type.startswith(COMPRESSIBLE_TYPES):
+            compressed = {"gzip": gzip.compress(body, compresslevel=settings.STATIC_GZIP_LEVEL, mtime=0)}
+            if brotli is not None:
+                compressed["br"] = brotli.compress(body, quality=settings.STATIC_BROTLI_QUALITY)
+            for encoding, data in compressed.items():
+                if len(data) < len(body):
+                    variants[encoding] = _Variant(data, f'"{digest}-{encoding}"')
+
+        return _Asset(content_type, cls._cache_control(path), variants)
+
+    @staticmethod
+    def _cache_control(path: str) -> str:
+        if path == "index.html":
+            return REVALIDATE
+        if HASHED_ASSET.match(path):
+            return IMMUTABLE
+        return SHORT_LIVED
+
+    @classmethod
+    def has(cls, path: str) -> bool:
+        return path in cls._assets
+
+    @staticmethod
+    def _accepted(header: str) -> List[str]:
+        accepted = []
+        for part in header.split(","):
+            token, _, params = part.strip().partition(";")
+            quality = 1.0
+            for param in params.split(";"):
+                key, _, value = param.strip().partition("=")
+                if key == "q":
+                    try:
+                        quality = float(value)
+                    except ValueError:
+                        quality = 0.0
+            if token and quality > 0:
+                accepted.append(token.strip().lower())
+        return accepted
+
+    @classmethod
+    def _choose(cls, asset: _Asset, accept_encoding: str) -> str:
+        accepted = cls._accepted(accept_encoding)
+        for encoding in ("br", "gzip"):
+            if encoding in asset.variants and (encoding in accepted or "*" in accepted):
+                return encoding
+        return "identity"
+
+    @staticmethod
+    def _matches(if_none_match: str, etag: str) -> bool:
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        # Weak comparison, as RFC 9110 requires for If-None-Match
+        return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+    @classmethod
+    def response(cls, path: str, request: Request) -> Optional[Response]:
+        """Serve a loaded file, or None if it is not part of the build"""
+        if not cls._loaded:
+            return cls._from_disk(path)
+        asset = cls._assets.get(path)
+        if asset is None:
+            return None
+
+        encoding = cls._choose(asset, request.headers.get("accept-encoding", ""))
+        variant = asset.variants[encoding]
+        headers = {"ETag": variant.etag, "Cache-Control": asset.cache_control}
+        if len(asset.variants) > 1:
+            headers["Vary"] = "Accept-Encoding"
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and cls._matches(if_none_match, variant.etag):
+            return Response(status_code=304, headers=headers)
+
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        body = b"" if request.method == "HEAD" else variant.body
+        response = Response(content=body, media_type=asset.content_type, headers=headers)
+        if request.method == "HEAD":
+            response.headers["content-length"] = str(len(variant.body))
+        return response
+
+    @classmethod
+    def _from_disk(cls, path: str) -> Optional[Response]:
+        if cls._directory is None:
+            return None
+        root = os.path.realpath(cls._directory)
+        full_path = os.path.realpath(os.path.join(root, path))
+        if not full_path.startswith(root + os.sep) or not os.path.isfile(full_path):
+            return None
+        return FileResponse(full_path, headers={"Cache-Control": cls._cache_control(path)})
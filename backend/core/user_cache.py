@@ -0,0 +1,79 @@
+from collections import OrderedDict
+from backend.core.config import settings
+from backend.database.redis import PubSubListener, RedisClient
+from backend.core.metrics import USER_CACHE_ENTRIES, USER_CACHE_EVICTIONS, USER_CACHE_LOOKUPS
+from typing import Optional, Dict, Any, Tuple
+import logging
+import time
+
+
+class UserCache:
+    """
+    Per-worker TTL/LRU cache of authenticated user documents keyed by token subject.
+
+    Changes to a user are broadcast over Redis pub/sub so every worker drops its
+    copy; the TTL bounds staleness if a broadcast is ever missed.
+    """
+
+    channel = "user_cache:invalidate"
+    _entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+    _listener: Optional[PubSubListener] = None
+
+    @classmethod
+    def get(cls, subject: str) -> Optional[Dict[str, Any]]:
+        """Get a cached user document"""
+        entry = cls._entries.get(subject)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del cls._entries[subject]
+                USER_CACHE_ENTRIES.set(len(cls._entries))
+            USER_CACHE_LOOKUPS.labels("miss").inc()
+            return None
+        cls._entries.move_to_end(subject)
+        USER_CACHE_LOOKUPS.labels("hit").inc()
+        return dict(entry[1])
+
+    @classmethod
+    def set(cls, subject: str, user: Dict[str, Any]) -> None:
+        """Cache a user document"""
+        cls._entries[subject] = (time.monotonic() + settings.USER_CACHE_TTL, dict(user))
+        cls._entries.move_to_end(subject)
+        while len(cls._entries) > settings.USER_CACHE_MAX_SIZE:
+            cls._entries.popitem(last=False)
+            USER_CACHE_EVICTIONS.inc()
+        USER_CACHE_ENTRIES.set(len(cls._entries))
+
+    @classmethod
+    def discard(cls, subject: str) -> None:
+        """Drop a user from this worker's cache"""
+        cls._entries.pop(subject, None)
+        USER_CACHE_ENTRIES.set(len(cls._entries))
+
+    @classmethod
+    def clear(cls) -> None:
+        """Drop every user from this worker's cache"""
+        cls._entries.clear()
+        USER_CACHE_ENTRIES.set(0)
+
+    @classmethod
+    async def invalidate(cls, subject: str) -> None:
+        """Drop a user from the cache in every worker"""
+        cls.discard(subject)
+        if RedisClient.redis:
+            try:
+                await RedisClient.redis.publish(cls.channel, subject)
+            except Exception as e:
+                logging.error(f"User cache invalidation publish error: {str(e)}")
+
+    @classmethod
+    async def start_listener(cls) -> None:
+        """Start listening for invalidations from other workers"""
+        if cls._listener is None:
+            cls._listener = PubSubListener(cls.channel, cls.discard, cls.clear)
+        await cls._listener.start()
+
+    @classmethod
+    async def stop_listener(cls) -> None:
+        """Stop the invalidation listener"""
+        if cls._listener is not None:
+            await cls._listener.stop()
@@ -1,8 +1,11 @@
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+from pymongo.errors import OperationFailure
 from backend.core.config import settings
+from backend.core.metrics import MongoCommandListener, MongoPoolListener
 import logging
 import os
-from typing import Optional
+from typing import Optional, Dict, List, Any, Tuple
 import urllib.parse
 import dns.resolver
 import ssl
@@ -11,6 +14,31 @@ class MongoDB:
     client: Optional[AsyncIOMotorClient] = None
     db = None
 
+    # Indexes backing the application's queries, per collection
+    INDEXES: Dict[str, List[IndexModel]] = {
+        "users": [
+            IndexModel([("email", ASCENDING)], name="email", unique=True),
+        ],
+        "chat_sessions": [
+            IndexModel([("id", ASCENDING)], name="session_id", unique=True),
+            IndexModel(
+                [("user_id", ASCENDING), ("timestamp", DESCENDING), ("id", DESCENDING)],
+                name="user_sessions"
+            ),
+            # Scoped full-text search; queries must filter on user_id
+            IndexModel([("user_id", ASCENDING), ("title", TEXT)], name="user_session_titles_text"),
+        ],
+        "chat_messages": [
+            IndexModel([("id", ASCENDING)], name="message_id", unique=True),
+            IndexModel(
+                [("session_id", ASCENDING), ("timestamp", ASCENDING), ("id", ASCENDING)],
+                name="session_timeline"
+            ),
+            IndexModel([("user_id", ASCENDING), ("timestamp", DESCENDING)], name="user_messages"),
+            IndexModel([("user_id", ASCENDING), ("text", TEXT)], name="user_messages_text"),
+        ],
+    }
+
     @classmethod
     async def connect_db(cls) -> None:
         """Connect to MongoDB/Cosmos DB"""
@@ -35,8 +63,9 @@ class MongoDB:
                     "socketTimeoutMS": 30000,
                     "authMechanism": "SCRAM-SHA-256",
                     "directConnection": False,
-                    "maxPoolSize": 10,
-                    "minPoolSize": 0
+                    "maxPoolSize": settings.MONGODB_MAX_POOL_SIZE,
+                    "minPoolSize": 0,
+                    "event_listeners": [MongoCommandListener(), MongoPoolListener()]
                 }
 
                 # Create client
@@ -82,11 +111,83 @@ class MongoDB:
             await cls.connect_db()
         return cls.db[collection_name]
 
+    # Hot query shapes (collection, filter, sort) checked against their query plans
+    QUERY_SHAPES: List[Tuple[str, Dict[str, Any], Optional[List[Tuple[str, int]]]]] = [
+        ("users", {"email": "probe@example.com"}, None),
+        ("chat_sessions", {"id": "probe", "user_id": "probe"}, None),
+        ("chat_sessions", {"user_id": "probe"}, [("timestamp", DESCENDING), ("id", DESCENDING)]),
+        ("chat_messages", {"id": "probe", "session_id": "probe"}, None),
+        ("chat_messages", {"session_id": "probe"}, [("timestamp", ASCENDING), ("id", ASCENDING)]),
+    ]
+
+    # Server error code for an index that already exists under another name or options
+    INDEX_OPTIONS_CONFLICT = 85
+
+    @classmethod
+    async def ensure_indexes(cls) -> None:
+        """Create required indexes; safe to run on every startup"""
+        db = await cls.get_db()
+        for collection_name, indexes in cls.INDEXES.items():
+            # One at a time, so a conflicting index doesn't take the rest of the collection's with it
+            for index in indexes:
+                name = index.document["name"]
+                try:
+                    await db[collection_name].create_indexes([index])
+                except OperationFailure as e:
+                    if TEXT in index.document["key"].values():
+                        # Not every backend supports text indexes; search falls back to regex
+                        logging.info(f"Text index {collection_name}.{name} unavailable, search will use regex: {str(e)}")
+                    elif e.code == cls.INDEX_OPTIONS_CONFLICT:
+                        logging.info(f"Equivalent index to {collection_name}.{name} already exists: {str(e)}")
+                    else:
+                        logging.warning(f"Failed to create index {collection_name}.{name}: {str(e)}")
+                except Exception as e:
+                    logging.warning(f"Failed to create index {collection_name}.{name}: {str(e)}")
+
+    @staticmethod
+    def _has_collection_scan(plan: Any) -> bool:
+        if isinstance(plan, dict):
+            if plan.get("stage") == "COLLSCAN":
+                return True
+            return any(MongoDB._has_collection_scan(value) for value in plan.values())
+        if isinstance(plan, list):
+            return any(MongoDB._has_collection_scan(value) for value in plan)
+        return False
+
+    @classmethod
+    async def verify_query_plans(cls) -> List[str]:
+        """Explain the application's query shapes and warn about any collection scans"""
+        db = await cls.get_db()
+        scans = []
+        for collection_name, query, sort in cls.QUERY_SHAPES:
+            shape = f"{collection_name}.find({query})" + (f".sort({sort})" if sort else "")
+            try:
+                cursor = db[collection_name].find(query)
+                if sort:
+                    cursor = cursor.sort(sort)
+                plan = await cursor.explain()
+            except Exception as e:
+                logging.warning(f"Could not explain {shape}: {str(e)}")
+                continue
+            if cls._has_collection_scan(plan.get("queryPlanner", plan)):
+                logging.warning(f"Query plan for {shape} uses a collection scan")
+                scans.append(shape)
+        return scans
+
     @classmethod
     def is_connected(cls) -> bool:
         """Check if connected to database"""
         return cls.client is not None and cls.db is not None
 
+    @classmethod
+    def pool_stats(cls) -> Dict[str, int]:
+        """This worker's connection pool usage"""
+        return {
+            "in_use": MongoPoolListener.in_use,
+            "waiting": MongoPoolListener.waiting,
+            "max": settings.MONGODB_MAX_POOL_SIZE,
+        }
+
     @classmethod
     async def ping(cls) -> bool:
         """Test database connection"""
@@ -1,14 +1,43 @@
 from redis import asyncio as aioredis
 from backend.core.config import settings
+from backend.core.metrics import REDIS_OPERATION_DURATION, REDIS_POOL_IN_USE, REDIS_POOL_WAIT
+from contextlib import asynccontextmanager
+import asyncio
 import logging
 import os
-from typing import Optional, Any
+from typing import Optional, Any, AsyncIterator, Callable, Dict, Iterable, Union
 import ssl
 import urllib.parse
 import socket
+import time
+
+# Delete a lock only if it still holds the caller's token
+RELEASE_LOCK_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+class _TimedConnectionPool(aioredis.BlockingConnectionPool):
+    """Blocking pool (waits for a free connection instead of erroring) that records the wait"""
+
+    waiting = 0
+
+    async def get_connection(self, command_name, *keys, **options):
+        started = time.perf_counter()
+        self.waiting += 1
+        try:
+            return await super().get_connection(command_name, *keys, **options)
+        finally:
+            self.waiting -= 1
+            REDIS_POOL_WAIT.observe(time.perf_counter() - started)
+            REDIS_POOL_IN_USE.set(len(self._in_use_connections))
+
 
 class RedisClient:
     redis: Optional[aioredis.Redis] = None
+    _release_lock_script = None
 
     @classmethod
     async def connect_redis(cls) -> None:
@@ -33,7 +62,7 @@ class RedisClient:
                 connection_url = f"rediss://:{urllib.parse.quote(str(redis_password))}@{redis_host}:{redis_port}"
 
                 # Create Redis client without SSL configuration for testing
-                cls.redis = aioredis.from_url(
+                pool = _TimedConnectionPool.from_url(
                     connection_url,
                     decode_responses=True,
                     socket_timeout=30.0,
@@ -41,8 +70,10 @@ class RedisClient:
                     socket_keepalive=True,
                     retry_on_timeout=True,
                     health_check_interval=30,
-                    max_connections=10
+                    max_connections=settings.REDIS_MAX_CONNECTIONS,
+                    timeout=settings.REDIS_POOL_TIMEOUT
                 )
+                cls.redis = aioredis.Redis(connection_pool=pool)
                 
                 # Test connection with increased timeout
                 await cls.redis.ping()
@@ -60,23 +91,35 @@ class RedisClient:
         if cls.redis:
             await cls.redis.close()
             cls.redis = None
+            cls._release_lock_script = None
             logging.info("Redis connection closed")
 
+    @classmethod
+    def _record(cls, operation: str, started: float) -> None:
+        """Record command latency and pool utilization"""
+        REDIS_OPERATION_DURATION.labels(operation).observe(time.perf_counter() - started)
+        if cls.redis:
+            REDIS_POOL_IN_USE.set(len(cls.redis.connection_pool._in_use_connections))
+
     @classmethod
     async def get_cache(cls, key: str) -> Optional[str]:
         """Get value from cache"""
         if cls.redis:
+            started = time.perf_counter()
             try:
                 return await cls.redis.get(key)
             except Exception as e:
                 logging.error(f"Redis get error: {str(e)}")
                 return None
+            finally:
+                cls._record("get", started)
         return None
 
     @classmethod
     async def set_cache(cls, key: str, value: str, ttl: Optional[int] = None) -> bool:
         """Set value in cache"""
         if cls.redis:
+            started = time.perf_counter()
             try:
                 if ttl is None:
                     ttl = settings.REDIS_TTL
@@ -85,20 +128,122 @@ class RedisClient:
             except Exception as e:
                 logging.error(f"Redis set error: {str(e)}")
                 return False
+            finally:
+                cls._record("set", started)
         return False
 
     @classmethod
     async def delete_cache(cls, key: str) -> bool:
         """Delete value from cache"""
         if cls.redis:
+            started = time.perf_counter()
             try:
                 await cls.redis.delete(key)
                 return True
             except Exception as e:
                 logging.error(f"Redis delete error: {str(e)}")
                 return False
+            finally:
+                cls._record("delete", started)
         return False
 
+    @classmethod
+    async def get_many(cls, keys: Iterable[str]) -> Dict[str, Optional[str]]:
+        """Get several values from cache in one round trip"""
+        keys = list(keys)
+        if cls.redis and keys:
+            started = time.perf_counter()
+            try:
+                return dict(zip(keys, await cls.redis.mget(keys)))
+            except Exception as e:
+                logging.error(f"Redis mget error: {str(e)}")
+            finally:
+                cls._record("get_many", started)
+        return {key: None for key in keys}
+
+    @classmethod
+    async def set_many(
+        cls,
+        items: Dict[str, str],
+        ttl: Union[int, Dict[str, int], None] = None
+    ) -> bool:
+        """
+        Set several values in cache in one round trip. `ttl` is one TTL for
+        every key or a per-key mapping; keys without one get REDIS_TTL.
+        """
+        if cls.redis and items:
+            started = time.perf_counter()
+            try:
+                pipe = cls.redis.pipeline(transaction=False)
+                for key, value in items.items():
+                    key_ttl = ttl.get(key) if isinstance(ttl, dict) else ttl
+                    pipe.set(key, value, ex=key_ttl or settings.REDIS_TTL)
+                await pipe.execute()
+                return True
+            except Exception as e:
+                logging.error(f"Redis set_many error: {str(e)}")
+                return False
+            finally:
+                cls._record("set_many", started)
+        return False
+
+    @classmethod
+    async def delete_many(cls, keys: Iterable[str]) -> bool:
+        """Delete several values from cache in one round trip"""
+        keys = list(keys)
+        if cls.redis and keys:
+            started = time.perf_counter()
+            try:
+                await cls.redis.delete(*keys)
+                return True
+            except Exception as e:
+                logging.error(f"Redis delete error: {str(e)}")
+                return False
+            finally:
+                cls._record("delete_many", started)
+        return False
+
+    @classmethod
+    @asynccontextmanager
+    async def pipeline(cls, transaction: bool = True) -> AsyncIterator[Any]:
+        """
+        Queue commands and send them in one round trip when the block exits
+        (wrapped in MULTI/EXEC unless transaction=False). Call
+        `await pipe.execute()` inside the block if the results are needed.
+        Raises if Redis is not connected; command errors propagate.
+        """
+        if not cls.redis:
+            raise RuntimeError("Redis is not connected")
+        async with cls.redis.pipeline(transaction=transaction) as pipe:
+            yield pipe
+            if len(pipe):
+                started = time.perf_counter()
+                try:
+                    await pipe.execute()
+                finally:
+                    cls._record("pipeline", started)
+
+    @classmethod
+    async def release_lock(cls, key: str, token: str) -> bool:
+        """Release a lock taken with SET NX, unless it has expired and been taken by someone else"""
+        if not cls.redis:
+            return False
+        if cls._release_lock_script is None:
+            cls._release_lock_script = cls.redis.register_script(RELEASE_LOCK_LUA)
+        return bool(await cls._release_lock_script(keys=[key], args=[token]))
+
+    @classmethod
+    def pool_stats(cls) -> Dict[str, int]:
+        """This worker's connection pool usage"""
+        if not cls.redis:
+            return {"in_use": 0, "waiting": 0, "max": settings.REDIS_MAX_CONNECTIONS}
+        pool = cls.redis.connection_pool
+        return {
+            "in_use": len(getattr(pool, "_in_use_connections", ())),
+            "waiting": getattr(pool, "waiting", 0),
+            "max": pool.max_connections,
+        }
+
     @classmethod
     async def ping(cls) -> bool:
         """Test Redis connection"""
@@ -121,3 +266,68 @@ class RedisClient:
                 logging.error(f"Redis clear error: {str(e)}")
                 return False
         return False
+
+
+class PubSubListener:
+    """
+    Background subscriber to one pub/sub channel, shared by everything in a
+    worker that listens on it so they cost one pooled connection in total.
+
+    Each message's data is passed to `on_message`. The subscription is
+    re-established with exponential backoff after errors, and `on_subscribe`
+    runs every time it is (re)established, since anything published while
+    unsubscribed was missed. `ready` is set while subscribed.
+    """
+
+    def __init__(
+        self,
+        channel: str,
+        on_message: Callable[[str], None],
+        on_subscribe: Optional[Callable[[], None]] = None
+    ):
+        self.channel = channel
+        self.on_message = on_message
+        self.on_subscribe = on_subscribe
+        self.ready = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    async def _listen(self) -> None:
+        delay = 1
+        while True:
+            pubsub = None
+            try:
+                pubsub = RedisClient.redis.pubsub()
+                await pubsub.subscribe(self.channel)
+                if self.on_subscribe is not None:
+                    self.on_subscribe()
+                self.ready.set()
+                delay = 1
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self.on_message(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"Pub/sub listener error on {self.channel}: {str(e)}")
+                self.ready.clear()
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30)
+            finally:
+                self.ready.clear()
+                if pubsub is not None:
+                    await pubsub.reset()
+
+    async def start(self) -> None:
+        """Start listening, if Redis is connected"""
+        if RedisClient.redis and self._task is None:
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        """Stop listening"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -1,13 +1,26 @@
 from fastapi import FastAPI, Request, Response, BackgroundTasks, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import JSONResponse
 from backend.api.routes import auth, chat
 from backend.core.config import settings
 import uvicorn
 from contextlib import asynccontextmanager
 from backend.database.mongodb import MongoDB
 from backend.database.redis import RedisClient
+from backend.core.user_cache import UserCache
+from backend.core.layered_cache import LayeredCache
+from backend.core.hashing import PasswordHasher
+from backend.core.rate_limit import RateLimitMiddleware
+from backend.core.metrics import MetricsMiddleware, mark_worker_dead, render_metrics
+from backend.services.llm_client import LLMClient
+from backend.services.ai_service import AIService
+from backend.services.singleflight import SingleFlight
+from backend.services.message_writer import MessageWriter
+from backend.services.message_migration import MessageMigration
+from backend.services.mailer import Mailer
+from backend.core.static_assets import StaticAssets
+from backend.core.health import HealthMonitor
+import asyncio
 import logging
 import os
 from pathlib import Path
@@ -23,19 +36,62 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+async def bootstrap() -> None:
+    """Startup work the first requests don't need, run once the worker is serving"""
+    steps = (
+        ("index creation", MongoDB.ensure_indexes),
+        # After the indexes, so the unique message id index dedupes concurrent migrations
+        ("embedded message migration", MessageMigration.run),
+        ("query plan check", MongoDB.verify_query_plans),
+        ("static asset loading", StaticAssets.load),
+    )
+    # A failed step must not skip the ones after it
+    for name, step in steps:
+        try:
+            await step()
+        except Exception as e:
+            logger.error(f"Startup {name} failed: {str(e)}")
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    background = []
     try:
         # Startup: Connect to databases
         await MongoDB.connect_db()
         await RedisClient.connect_redis()
         logger.info("Successfully connected to databases")
+        await UserCache.start_listener()
+        await LayeredCache.start_listener()
+        await SingleFlight.start_listener()
+        PasswordHasher.start()
+        MessageWriter.start()
+        Mailer.start()
+        await HealthMonitor.start()
+        # Static files are served from disk until they are compressed into memory
+        StaticAssets.serve(static_path)
+        background.append(asyncio.create_task(bootstrap()))
+        if settings.AI_WARMUP_ENABLED:
+            # The AI stack loads lazily; warm it once this worker is already serving auth and history
+            background.append(asyncio.create_task(AIService.warm_up(delay=settings.AI_WARMUP_DELAY)))
         yield
     finally:
-        # Shutdown: Close connections
+        # Shutdown: Write out buffered messages, then close connections
+        for task in background:
+            task.cancel()
+        # Let cancelled work unwind before the connections it uses are closed
+        await asyncio.gather(*background, return_exceptions=True)
+        await HealthMonitor.stop()
+        await MessageWriter.stop()
+        await Mailer.stop()
+        PasswordHasher.shutdown()
+        await LLMClient.close()
+        await UserCache.stop_listener()
+        await LayeredCache.stop_listener()
+        await SingleFlight.stop_listener()
         await MongoDB.close_db()
         await RedisClient.close_redis()
         logger.info("Database connections closed")
+        mark_worker_dead()
 
 app = FastAPI(
     title="SmartChat API",
@@ -43,6 +99,9 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Rate limiting (added before CORS so rejections still carry CORS headers)
+app.add_middleware(RateLimitMiddleware)
+
 # CORS middleware with proper configuration
 app.add_middleware(
     CORSMiddleware,
@@ -52,24 +111,37 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request latency metrics (outermost, so rejected and CORS requests are timed too)
+app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(chat.router, prefix="/api/chat", tags=["Chat"])
 
-# Health check endpoint
+# Health check endpoint (liveness: the process is up and serving)
 @app.get("/api/health")
+@app.get("/api/health/live")
 async def health_check():
     return {"status": "healthy"}
 
-# Ensure static directory exists
+# Readiness: dependencies reachable and this worker not saturated
+@app.get("/api/health/ready")
+async def readiness_check():
+    ready, report = HealthMonitor.readiness()
+    return JSONResponse(status_code=200 if ready else 503, content=report)
+
+# Prometheus metrics endpoint
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+# Ensure static directory exists; the frontend build is served from memory once loaded
 static_path = os.path.join(os.path.dirname(__file__), "static")
 os.makedirs(static_path, exist_ok=True)
 
-# Mount static files from frontend build
-app.mount("/assets", StaticFiles(directory=os.path.join(static_path, "assets")), name="assets")
-
-@app.get("/{full_path:path}")
-async def serve_frontend(full_path: str):
+@app.api_route("/{full_path:path}", methods=["GET", "HEAD"])
+async def serve_frontend(full_path: str, request: Request):
     """Serve frontend static files and handle client-side routing"""
     # If API request, let it pass through to the API routes
     if full_path.startswith("api/"):
@@ -77,16 +149,21 @@ async def serve_frontend(full_path: str):
             status_code=404,
             content={"message": "API route not found"}
         )
-        
+
+    response = StaticAssets.response(full_path, request)
+    if response is not None:
+        return response
+    if full_path.startswith("assets/"):
+        return JSONResponse(status_code=404, content={"message": "Asset not found"})
+
     # For all other routes, serve the index.html
-    index_path = os.path.join(static_path, "index.html")
-    if os.path.exists(index_path):
-        return FileResponse(index_path)
-    else:
-        return JSONResponse(
-            status_code=404,
-            content={"message": "Frontend not built. Please run 'npm run build' first."}
-        )
+    response = StaticAssets.response("index.html", request)
+    if response is not None:
+        return response
+    return JSONResponse(
+        status_code=404,
+        content={"message": "Frontend not built. Please run 'npm run build' first."}
+    )
 
 if __name__ == "__main__":
     uvicorn.run(
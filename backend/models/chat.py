@@ -22,4 +22,16 @@ class ChatSession(BaseModel):
     last_message: Optional[str] = None
     timestamp: datetime = Field(default_factory=datetime.utcnow)
     user_id: str
-    messages: List[ChatMessage] = []
\ No newline at end of file
+    messages: List[ChatMessage] = []
+
+
+class SessionSummary(BaseModel):
+    id: str
+    title: str
+    last_message: Optional[str] = None
+    timestamp: datetime
+
+
+class SessionSummaryPage(BaseModel):
+    items: List[SessionSummary]
+    next_cursor: Optional[str] = None
@@ -1,6 +1,7 @@
-from interpreter import interpreter
-from typing import Optional
+from typing import TYPE_CHECKING, Optional, AsyncIterator, List, Dict
 import asyncio
+import importlib
+import threading
 from concurrent.futures import ThreadPoolExecutor
 import logging
 from fastapi import HTTPException, status
@@ -9,23 +10,30 @@ import certifi
 import ssl
 import httpx
 import urllib3
+import time
+from backend.core.config import settings
+from backend.core.metrics import AI_EXECUTION_DURATION, AI_EXECUTOR_ACTIVE
+from .interpreter_pool import InterpreterPool
+from .response_cache import ResponseCache
+from .context_builder import ConversationContext
+from .llm_client import LLMClient
+from .singleflight import SingleFlight
+from .fair_scheduler import FairScheduler, TIER_BACKGROUND
+
+if TYPE_CHECKING:
+    from interpreter import OpenInterpreter
+
+# Between the assistant messages of one interpreter run
+MESSAGE_SEPARATOR = "\n\n"
 
 class AIService:
     _instance = None
-    _executor = ThreadPoolExecutor(max_workers=10)  # Limit concurrent AI calls
+    # One worker thread per pooled interpreter so concurrency scales with the pool
+    _executor = ThreadPoolExecutor(max_workers=settings.INTERPRETER_POOL_SIZE)
 
-    def __init__(self):
-        # Configure SSL settings
-        self._configure_ssl()
-        
-        # Initialize interpreter settings
-        interpreter.auto_run = True  # Disable approval requirement
-        interpreter.llm.model = "gpt-3.5-turbo"
-        interpreter.llm.temperature = 0.7
-        interpreter.llm.api_key = os.environ.get('OPENAI_API_KEY')
-        interpreter.llm.supports_functions = True
-        
-        interpreter.custom_instructions = """
+    model = "gpt-3.5-turbo"
+    temperature = 0.7
+    custom_instructions = """
         You are 'Maddy', an AI assistant created by EY India GEN AI Engineers. Your primary focus is on:
         1. Supply chain analysis and optimization
         2. Root cause analysis (RCA)
@@ -37,69 +45,387 @@ class AIService:
         Focus on providing actionable insights and clear explanations.
         """
 
+    def __init__(self):
+        # Configure SSL settings
+        self._configure_ssl()
+
+        self.pool = InterpreterPool(
+            factory=self._create_interpreter,
+            max_size=settings.INTERPRETER_POOL_SIZE,
+            idle_timeout=settings.INTERPRETER_IDLE_TIMEOUT
+        )
+        self.cache = ResponseCache()
+        self.singleflight = SingleFlight()
+        self.scheduler = FairScheduler(slots=settings.INTERPRETER_POOL_SIZE)
+        self.engine = settings.AI_ENGINE
+        if self.engine == "http":
+            LLMClient.connect(verify=self.ssl_context)
+
     def _configure_ssl(self):
         """Configure SSL settings for the environment"""
         try:
-            cert_path = '/app/backend/certs/cert.crt'
-            
+            cert_path = settings.SSL_CA_BUNDLE
+
             # Set SSL verification environment variables
             os.environ['REQUESTS_CA_BUNDLE'] = cert_path
             os.environ['SSL_CERT_FILE'] = cert_path
             os.environ['CURL_CA_BUNDLE'] = cert_path
-            
-            # Create a custom SSL context
+
+            # Create a custom SSL context, shared with the async LLM client
             ssl_context = ssl.create_default_context(cafile=cert_path)
             ssl_context.verify_mode = ssl.CERT_REQUIRED
             ssl_context.check_hostname = True
-            
+            self.ssl_context = ssl_context
+
             # Configure urllib3 to use our certificate
             urllib3.util.ssl_.DEFAULT_CERTS = cert_path
-            
-            # Configure httpx client with our certificate
-            httpx.Client(verify=cert_path)
-            
+
         except Exception as e:
             logging.error(f"Failed to configure SSL settings: {str(e)}")
             raise
 
+    def _create_interpreter(self) -> "OpenInterpreter":
+        """Create an interpreter instance with the assistant's settings"""
+        # Imported on first use: the interpreter package is slow to import and not needed to boot
+        from interpreter import OpenInterpreter
+
+        instance = OpenInterpreter()
+        instance.auto_run = True  # Disable approval requirement
+        instance.llm.model = self.model
+        instance.llm.temperature = self.temperature
+        instance.llm.api_key = os.environ.get('OPENAI_API_KEY')
+        if settings.OPENAI_API_BASE:
+            instance.llm.api_base = settings.OPENAI_API_BASE
+        instance.llm.supports_functions = True
+        instance.custom_instructions = self.custom_instructions
+        return instance
+
     @classmethod
     def get_instance(cls):
         if cls._instance is None:
             cls._instance = AIService()
         return cls._instance
 
-    async def get_ai_response(self, message: str, user_id: str) -> str:
+    @classmethod
+    async def warm_up(cls, delay: float = 0.0) -> None:
+        """
+        Load the AI stack in the background after startup, so the first chat
+        request does not pay for the interpreter import and SSL setup
+        """
+        await asyncio.sleep(delay)
+        started = time.perf_counter()
+        try:
+            instance = cls.get_instance()
+            if instance.engine != "http":
+                # The import is CPU-bound; keep it off the event loop
+                await asyncio.to_thread(importlib.import_module, "interpreter")
+            logging.info(f"AI service warmed up in {time.perf_counter() - started:.2f}s")
+        except Exception as e:
+            logging.error(f"AI service warm-up failed: {str(e)}")
+
+    def check_admission(self, user_id: str) -> None:
+        """Raise 429/503 up front if the user's request would be turned away"""
+        if self.engine != "http":
+            self.scheduler.check(user_id)
+
+    def _submit(self, mode: str, func, *args) -> asyncio.Future:
         """
-        Get AI response asynchronously using a thread pool to prevent blocking
+        Run func on the AI executor, recording execution time. The caller must
+        hold a scheduler slot; it is released when func finishes.
         """
+        def run():
+            started = time.perf_counter()
+            AI_EXECUTOR_ACTIVE.inc()
+            try:
+                return func(*args)
+            finally:
+                AI_EXECUTOR_ACTIVE.dec()
+                AI_EXECUTION_DURATION.labels(mode).observe(time.perf_counter() - started)
+
+        future = asyncio.get_running_loop().run_in_executor(self._executor, run)
+        future.add_done_callback(lambda _: self.scheduler.release())
+        return future
+
+    def _cache_key(self, message: str, context: Optional[ConversationContext]) -> str:
+        instructions = self.custom_instructions
+        if context is not None:
+            # Answers depend on the conversation so far, so it is part of the key
+            instructions += context.fingerprint()
+        return self.cache.make_key(message, self.model, self.temperature, instructions)
+
+    async def _checkout(self, session_id: Optional[str], context: Optional[ConversationContext]):
+        """Get an interpreter for the request, loaded with the supplied context"""
+        entry = None
+        if session_id:
+            entry = await self.pool.acquire(session_id)
+            instance = entry.interpreter
+        else:
+            instance = self._create_interpreter()
+
+        # The context is the only conversation state; nothing carries over between requests
+        instance.custom_instructions = self.custom_instructions
+        instance.messages = []
+        if context is not None:
+            instance.messages = context.interpreter_messages()
+            instance.custom_instructions += context.instructions()
+        return entry, instance
+
+    async def summarize(self, summary: Optional[str], messages: List[Dict[str, str]]) -> str:
+        """Fold conversation turns into a running summary"""
+        transcript = "\n".join(
+            f"{'User' if message['role'] == 'user' else 'Assistant'}: {message['content']}"
+            for message in messages
+        )
+        prompt = (
+            "Update the running summary of this conversation. Keep the facts, figures, "
+            "decisions and open questions needed to continue it, in at most "
+            f"{settings.CONTEXT_SUMMARY_MAX_WORDS} words. Reply with the summary only.\n\n"
+            f"Current summary:\n{summary or 'None'}\n\n"
+            f"New messages:\n{transcript}"
+        )
+        if self.engine == "http":
+            return await LLMClient.chat(self._chat_messages(prompt, None), self.model, self.temperature)
+        await self.scheduler.acquire("", tier=TIER_BACKGROUND)
         try:
-            # Run the interpreter in a separate thread to avoid blocking
-            response = await asyncio.get_event_loop().run_in_executor(
-                self._executor,
-                self._get_interpreter_response,
-                message
-            )
+            instance = self._create_interpreter()
+            job = self._submit("summary", self._get_interpreter_response, instance, prompt)
+        except BaseException:
+            # Once submitted, the job releases its own slot
+            self.scheduler.release()
+            raise
+        return await job
+
+    def _chat_messages(self, message: str, context: Optional[ConversationContext]) -> List[Dict[str, str]]:
+        """Build a chat completion message list for the HTTP engine"""
+        system = self.custom_instructions
+        history: List[Dict[str, str]] = []
+        if context is not None:
+            system += context.instructions()
+            history = context.messages
+        return [{"role": "system", "content": system}, *history, {"role": "user", "content": message}]
+
+    async def get_ai_response(
+        self,
+        message: str,
+        user_id: str,
+        session_id: Optional[str] = None,
+        use_cache: bool = True,
+        context: Optional[ConversationContext] = None
+    ) -> str:
+        """
+        Get AI response asynchronously using a thread pool to prevent blocking
+        """
+        # A cache bypass must get a fresh answer, not someone else's in-flight one
+        coalesce = use_cache and settings.SINGLEFLIGHT_ENABLED
+        use_cache = use_cache and settings.AI_CACHE_ENABLED
+        if use_cache:
+            cached = await self.cache.get(self._cache_key(message, context))
+            if cached is not None:
+                return cached
+
+        async def generate() -> str:
+            response = await self._generate_response(message, user_id, session_id, context)
+            if use_cache:
+                await self.cache.set(self._cache_key(message, context), response)
             return response
+
+        if not coalesce:
+            return await generate()
+        # Identical concurrent requests (same prompt, model and context) share one LLM call,
+        # but each caller is still admitted against its own quota
+        self.check_admission(user_id)
+        return await self.singleflight.do(
+            self._cache_key(message, context), generate, share_error=self._shares_error
+        )
+
+    @staticmethod
+    def _shares_error(error: BaseException) -> bool:
+        """Whether a coalesced leader's failure applies to its followers too"""
+        # A per-user rejection is about the leader's user, not the request
+        return not (isinstance(error, HTTPException) and error.status_code == status.HTTP_429_TOO_MANY_REQUESTS)
+
+    async def _generate_response(
+        self,
+        message: str,
+        user_id: str,
+        session_id: Optional[str],
+        context: Optional[ConversationContext]
+    ) -> str:
+        entry = None
+        try:
+            if self.engine == "http":
+                started = time.perf_counter()
+                response = await LLMClient.chat(
+                    self._chat_messages(message, context), self.model, self.temperature
+                )
+                AI_EXECUTION_DURATION.labels("http").observe(time.perf_counter() - started)
+            else:
+                # Wait for the session's interpreter before taking an executor slot, so
+                # requests queued behind the same session don't idle on slots
+                entry, instance = await self._checkout(session_id, context)
+                await self.scheduler.acquire(user_id, session_id)
+
+                # Run the interpreter in a separate thread to avoid blocking
+                response = await self._submit("chat", self._get_interpreter_response, instance, message)
+        except HTTPException:
+            raise
         except Exception as e:
             logging.error(f"AI Service error for user {user_id}: {str(e)}")
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Failed to generate AI response"
             )
+        finally:
+            if entry is not None:
+                self.pool.release(entry)
+        return response
 
-    def _get_interpreter_response(self, message: str) -> str:
+    async def stream_ai_response(
+        self,
+        message: str,
+        user_id: str,
+        session_id: Optional[str] = None,
+        use_cache: bool = True,
+        context: Optional[ConversationContext] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream AI response chunks as they are produced by the model
+        """
+        use_cache = use_cache and settings.AI_CACHE_ENABLED
+        if use_cache:
+            cached = await self.cache.get(self._cache_key(message, context))
+            if cached is not None:
+                yield cached
+                return
+
+        if self.engine == "http":
+            chunks = self._stream_http_response(message, user_id, context)
+        else:
+            chunks = self._stream_interpreter_response(message, user_id, session_id, context)
+
+        parts: List[str] = []
+        try:
+            async for chunk in chunks:
+                parts.append(chunk)
+                yield chunk
+        finally:
+            # Release the model promptly if the client disconnects mid-stream
+            await chunks.aclose()
+
+        if use_cache:
+            await self.cache.set(self._cache_key(message, context), "".join(parts))
+
+    async def _stream_http_response(
+        self,
+        message: str,
+        user_id: str,
+        context: Optional[ConversationContext]
+    ) -> AsyncIterator[str]:
+        started = time.perf_counter()
+        try:
+            async for chunk in LLMClient.stream_chat(
+                self._chat_messages(message, context), self.model, self.temperature
+            ):
+                yield chunk
+        except httpx.HTTPError as e:
+            logging.error(f"AI Service streaming error for user {user_id}: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to generate AI response"
+            )
+        finally:
+            AI_EXECUTION_DURATION.labels("http_stream").observe(time.perf_counter() - started)
+
+    async def _stream_interpreter_response(
+        self,
+        message: str,
+        user_id: str,
+        session_id: Optional[str],
+        context: Optional[ConversationContext]
+    ) -> AsyncIterator[str]:
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        cancelled = threading.Event()
+        done = object()
+        item = None
+        # Session lock first, then the executor slot (see _generate_response)
+        entry, instance = await self._checkout(session_id, context)
+        try:
+            await self.scheduler.acquire(user_id, session_id)
+        except BaseException:
+            if entry is not None:
+                self.pool.release(entry)
+            raise
+
+        def produce():
+            try:
+                for chunk in self._iter_interpreter_chunks(instance, message):
+                    if cancelled.is_set():
+                        break
+                    loop.call_soon_threadsafe(queue.put_nowait, chunk)
+            except Exception as e:
+                loop.call_soon_threadsafe(queue.put_nowait, e)
+            finally:
+                loop.call_soon_threadsafe(queue.put_nowait, done)
+
+        self._submit("stream", produce)
+        try:
+            while True:
+                item = await queue.get()
+                if item is done:
+                    break
+                if isinstance(item, Exception):
+                    logging.error(f"AI Service streaming error for user {user_id}: {str(item)}")
+                    raise HTTPException(
+                        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                        detail="Failed to generate AI response"
+                    )
+                yield item
+        finally:
+            # Stop the worker thread early if the client went away
+            cancelled.set()
+            if entry is not None:
+                self.pool.release(entry)
+                if item is not done:
+                    # The interpreter may still be mid-run; don't hand it to the next request
+                    self.pool.discard(session_id)
+
+    def _iter_interpreter_chunks(self, instance: "OpenInterpreter", message: str):
+        """
+        Yield assistant message text chunks from a streaming interpreter run.
+        Separate assistant messages (e.g. before and after running code) are
+        joined with a blank line, matching _get_interpreter_response.
+        """
+        emitted = False
+        new_message = False
+        for chunk in instance.chat(message, stream=True, display=False):
+            if not isinstance(chunk, dict):
+                continue
+            is_assistant_message = chunk.get('role') == 'assistant' and chunk.get('type') == 'message'
+            if not is_assistant_message or chunk.get('start'):
+                # Code, console output or a fresh message: the next text is a new message
+                new_message = True
+            if is_assistant_message and chunk.get('content'):
+                if new_message and emitted:
+                    yield MESSAGE_SEPARATOR
+                new_message = False
+                emitted = True
+                yield chunk['content']
+
+    def _get_interpreter_response(self, instance: "OpenInterpreter", message: str) -> str:
         """
         Get response from interpreter in a synchronous manner
         """
         try:
             # Use chat method for single response
-            response = interpreter.chat(message)
-            
-            # Extract the last assistant message
+            response = instance.chat(message)
+
+            # Join this run's assistant messages, as the streaming path does
             if isinstance(response, list):
-                for msg in reversed(response):
-                    if msg.get('role') == 'assistant':
-                        return msg.get('content', '')
+                return MESSAGE_SEPARATOR.join(
+                    msg.get('content', '') for msg in response
+                    if msg.get('role') == 'assistant' and msg.get('type', 'message') == 'message' and msg.get('content')
+                )
             return str(response)
         except Exception as e:
             logging.error(f"Interpreter error: {str(e)}")
@@ -107,4 +433,4 @@ class AIService:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Failed to generate AI response"
-            )
\ No newline at end of file
+            )
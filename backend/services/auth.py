@@ -3,23 +3,22 @@ from fastapi import HTTPException, status
 from backend.core.config import settings
 from backend.database.mongodb import MongoDB
 from backend.database.redis import RedisClient
-from passlib.context import CryptContext
+from backend.core.user_cache import UserCache
+from backend.core.hashing import PasswordHasher
 from jose import jwt
 from backend.models.user import UserCreate, UserInDB, UserResponse
 import logging
 from typing import Optional, Dict, Any
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 class AuthService:
     def __init__(self):
         self.users_collection = "users"
 
-    def get_password_hash(self, password: str) -> str:
-        return pwd_context.hash(password)
+    async def get_password_hash(self, password: str) -> str:
+        return await PasswordHasher.hash(password)
 
-    def verify_password(self, plain_password: str, hashed_password: str) -> bool:
-        return pwd_context.verify(plain_password, hashed_password)
+    async def verify_password(self, plain_password: str, hashed_password: str) -> bool:
+        return await PasswordHasher.verify(plain_password, hashed_password)
 
     async def get_user_by_email(self, email: str):
         users = await MongoDB.get_collection(self.users_collection)
@@ -35,7 +34,7 @@ class AuthService:
             )
         
         user_dict = user.model_dump()
-        user_dict["hashed_password"] = self.get_password_hash(user_dict.pop("password"))
+        user_dict["hashed_password"] = await self.get_password_hash(user_dict.pop("password"))
         user_dict["created_at"] = datetime.utcnow()
         
         result = await users.insert_one(user_dict)
@@ -47,7 +46,7 @@ class AuthService:
         user = await self.get_user_by_email(email)
         if not user:
             return False
-        if not self.verify_password(password, user["hashed_password"]):
+        if not await self.verify_password(password, user["hashed_password"]):
             return False
         return user
 
@@ -126,7 +125,7 @@ class AuthService:
             
             # Update password
             users = await MongoDB.get_collection(self.users_collection)
-            hashed_password = self.get_password_hash(new_password)
+            hashed_password = await self.get_password_hash(new_password)
             
             result = await users.update_one(
                 {"email": email},
@@ -142,6 +141,9 @@ class AuthService:
             # Remove reset token from Redis
             await RedisClient.redis.delete(f"reset_token:{email}")
             
+            # Drop the stale user document from every worker's cache
+            await UserCache.invalidate(email)
+            
         except jwt.ExpiredSignatureError:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
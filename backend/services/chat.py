@@ -1,26 +1,48 @@
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, AsyncIterator
 from fastapi import HTTPException, status
 from backend.models.chat import ChatMessage, ChatResponse, ChatSession
 from backend.database.mongodb import MongoDB
 from backend.database.redis import RedisClient
 from datetime import datetime
 from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING
 import logging
 import json
+from backend.core.pagination import encode_cursor, decode_cursor
+from backend.core.layered_cache import LayeredCache
+from backend.core.config import settings
 from .ai_service import AIService
+from .context_builder import ContextBuilder
+from .message_writer import MessageWriter
 
 class ChatService:
     def __init__(self):
         self.sessions_collection = "chat_sessions"
         self.messages_collection = "chat_messages"
-        self.ai_service = AIService.get_instance()
+        self.context_builder = ContextBuilder(self._summarize)
+        # Sessions never change owner, so ownership checks are served from memory
+        self.session_owners = LayeredCache(
+            "session_owner",
+            ttl=settings.SESSION_OWNER_CACHE_TTL,
+            local_ttl=settings.SESSION_OWNER_LOCAL_TTL
+        )
+
+    @property
+    def ai_service(self) -> AIService:
+        """The AI service, created on first use so importing the routes stays cheap"""
+        return AIService.get_instance()
+
+    async def _summarize(self, summary: Optional[str], messages: List[Dict[str, str]]) -> str:
+        return await self.ai_service.summarize(summary, messages)
 
     async def create_session(self, user_id: str) -> ChatSession:
         try:
             sessions = await MongoDB.get_collection(self.sessions_collection)
+            messages = await MongoDB.get_collection(self.messages_collection)
             
+            session_id = str(ObjectId())
             session = ChatSession(
-                id=str(ObjectId()),
+                id=session_id,
                 title="New Analysis",
                 user_id=str(user_id),
                 timestamp=datetime.utcnow(),
@@ -29,12 +51,17 @@ class ChatService:
                         id=str(ObjectId()),
                         text="Hello! How can I help you with supply chain analysis today?",
                         sender="bot",
+                        session_id=session_id,
                         timestamp=datetime.utcnow()
                     )
                 ]
             )
             
-            await sessions.insert_one(session.model_dump())
+            # Messages live in their own collection, not embedded in the session
+            await sessions.insert_one(session.model_dump(exclude={"messages"}))
+            await messages.insert_many([
+                self._message_document(message, session.user_id) for message in session.messages
+            ])
             return session
         except Exception as e:
             logging.error(f"Failed to create chat session: {str(e)}")
@@ -43,21 +70,47 @@ class ChatService:
                 detail="Failed to create chat session"
             )
 
-    async def process_message(self, text: str, session_id: str, user: dict) -> ChatResponse:
+    async def _load_session_owner(self, session_id: str) -> Optional[Dict[str, Any]]:
+        sessions = await MongoDB.get_collection(self.sessions_collection)
+        return await sessions.find_one({"id": session_id}, {"_id": 0, "id": 1, "user_id": 1})
+
+    async def _get_user_session(self, session_id: str, user_id: str) -> Dict[str, Any]:
+        """Verify a session exists and belongs to the user, returning its id and owner"""
+        session = await self.session_owners.get_or_load(
+            session_id, lambda: self._load_session_owner(session_id)
+        )
+        if not session or session["user_id"] != user_id:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Chat session not found"
+            )
+        return session
+
+    @staticmethod
+    def _message_document(message: ChatMessage, user_id: str) -> Dict[str, Any]:
+        return {**message.model_dump(), "user_id": user_id}
+
+    async def _save_exchange(
+        self,
+        session_id: str,
+        user_id: str,
+        user_message: ChatMessage,
+        response: ChatResponse
+    ) -> None:
+        """Persist a user message and the bot reply to the session"""
+        await MessageWriter.append(
+            [
+                self._message_document(user_message, user_id),
+                self._message_document(ChatMessage(**response.model_dump()), user_id)
+            ],
+            session_id,
+            {"last_message": response.text, "timestamp": datetime.utcnow()}
+        )
+
+    async def process_message(self, text: str, session_id: str, user: dict, use_cache: bool = True) -> ChatResponse:
         try:
-            sessions = await MongoDB.get_collection(self.sessions_collection)
-            
             # Verify session exists and belongs to user
-            session = await sessions.find_one({
-                "id": session_id,
-                "user_id": str(user["_id"])
-            })
-            
-            if not session:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Chat session not found"
-                )
+            await self._get_user_session(session_id, str(user["_id"]))
             
             # Save user message
             user_message = ChatMessage(
@@ -68,8 +121,11 @@ class ChatService:
                 timestamp=datetime.utcnow()
             )
             
-            # Get AI response
-            ai_response_text = await self.ai_service.get_ai_response(text, str(user["_id"]))
+            # Get AI response with the session's conversation so far
+            context = await self.context_builder.build(session_id, text)
+            ai_response_text = await self.ai_service.get_ai_response(
+                text, str(user["_id"]), session_id, use_cache=use_cache, context=context
+            )
             
             # Create response object
             response = ChatResponse(
@@ -81,21 +137,8 @@ class ChatService:
             )
             
             # Update session with messages
-            await sessions.update_one(
-                {"id": session_id},
-                {
-                    "$push": {"messages": {
-                        "$each": [
-                            user_message.model_dump(),
-                            response.model_dump()
-                        ]
-                    }},
-                    "$set": {
-                        "last_message": response.text,
-                        "timestamp": datetime.utcnow()
-                    }
-                }
-            )
+            await self._save_exchange(session_id, str(user["_id"]), user_message, response)
+            self.context_builder.schedule_fold(session_id)
             
             return response
         except HTTPException:
@@ -107,10 +150,71 @@ class ChatService:
                 detail="Failed to process message"
             )
 
+    async def stream_message(self, text: str, session_id: str, user: dict, use_cache: bool = True) -> AsyncIterator[str]:
+        """
+        Verify the session, then return an NDJSON event stream of the AI reply.
+        The complete reply is persisted once the stream ends.
+        """
+        try:
+            await self._get_user_session(session_id, str(user["_id"]))
+            # Turn away overload before the stream starts, while a status code can still be sent
+            self.ai_service.check_admission(str(user["_id"]))
+        except HTTPException:
+            raise
+        except Exception as e:
+            logging.error(f"Failed to process message: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to process message"
+            )
+
+        user_message = ChatMessage(
+            id=str(ObjectId()),
+            text=text,
+            sender="user",
+            session_id=session_id,
+            timestamp=datetime.utcnow()
+        )
+        return self._stream_events(user_message, session_id, str(user["_id"]), use_cache)
+
+    async def _stream_events(
+        self,
+        user_message: ChatMessage,
+        session_id: str,
+        user_id: str,
+        use_cache: bool
+    ) -> AsyncIterator[str]:
+        response_id = str(ObjectId())
+        chunks: List[str] = []
+        yield json.dumps({"type": "start", "id": response_id, "session_id": session_id}) + "\n"
+        try:
+            context = await self.context_builder.build(session_id, user_message.text)
+            async for chunk in self.ai_service.stream_ai_response(
+                user_message.text, user_id, session_id, use_cache=use_cache, context=context
+            ):
+                chunks.append(chunk)
+                yield json.dumps({"type": "chunk", "text": chunk}) + "\n"
+
+            response = ChatResponse(
+                id=response_id,
+                text="".join(chunks),
+                sender="bot",
+                session_id=session_id,
+                timestamp=datetime.utcnow()
+            )
+            await self._save_exchange(session_id, user_id, user_message, response)
+            self.context_builder.schedule_fold(session_id)
+            yield json.dumps({"type": "end", "message": response.model_dump(mode="json")}) + "\n"
+        except HTTPException as e:
+            yield json.dumps({"type": "error", "detail": e.detail}) + "\n"
+        except Exception as e:
+            logging.error(f"Failed to stream message: {str(e)}")
+            yield json.dumps({"type": "error", "detail": "Failed to process message"}) + "\n"
+
     async def get_user_sessions(self, user_id: str) -> List[ChatSession]:
         try:
             sessions = await MongoDB.get_collection(self.sessions_collection)
-            cursor = sessions.find({"user_id": user_id}).sort("timestamp", -1)
+            cursor = sessions.find({"user_id": user_id}, {"messages": 0}).sort("timestamp", -1)
             return [ChatSession(**session) async for session in cursor]
         except Exception as e:
             logging.error(f"Failed to get user sessions: {str(e)}")
@@ -119,21 +223,128 @@ class ChatService:
                 detail="Failed to fetch chat sessions"
             )
 
-    async def get_session_messages(self, session_id: str, user_id: str) -> List[ChatMessage]:
+    async def get_user_session_summaries(
+        self,
+        user_id: str,
+        cursor: Optional[str] = None,
+        limit: int = 50
+    ) -> Dict[str, Any]:
+        """
+        Get a page of lightweight session summaries, newest first.
+
+        Only the fields needed to render a session list are read, and documents
+        are returned as plain JSON-ready dicts rather than validated models.
+        """
         try:
             sessions = await MongoDB.get_collection(self.sessions_collection)
-            session = await sessions.find_one({
-                "id": session_id,
-                "user_id": user_id
-            })
-            
-            if not session:
+
+            query: Dict[str, Any] = {"user_id": user_id}
+            if cursor:
+                timestamp, session_id = decode_cursor(cursor)
+                query["$or"] = [
+                    {"timestamp": {"$lt": timestamp}},
+                    {"timestamp": timestamp, "id": {"$lt": session_id}}
+                ]
+
+            # Fetch one extra document to know whether another page exists
+            documents = await sessions.find(
+                query,
+                {"_id": 0, "id": 1, "title": 1, "last_message": 1, "timestamp": 1}
+            ).sort([("timestamp", DESCENDING), ("id", DESCENDING)]).limit(limit + 1).to_list(limit + 1)
+
+            has_more = len(documents) > limit
+            documents = documents[:limit]
+            next_cursor = None
+            if has_more:
+                last = documents[-1]
+                next_cursor = encode_cursor(last["timestamp"], last["id"])
+
+            for document in documents:
+                document["timestamp"] = document["timestamp"].isoformat()
+                document.setdefault("last_message", None)
+            return {"items": documents, "next_cursor": next_cursor}
+        except HTTPException:
+            raise
+        except Exception as e:
+            logging.error(f"Failed to get user session summaries: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to fetch chat sessions"
+            )
+
+    async def get_session_messages(
+        self,
+        session_id: str,
+        user_id: str,
+        before: Optional[str] = None,
+        after: Optional[str] = None,
+        limit: int = 50
+    ) -> List[ChatMessage]:
+        """
+        Get a page of a session's messages in chronological order.
+
+        Without a cursor the most recent `limit` messages are returned. `before`
+        and `after` take a message id and return the page immediately preceding
+        or following that message.
+        """
+        try:
+            if before and after:
                 raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Chat session not found"
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Use either 'before' or 'after', not both"
                 )
-                
-            return [ChatMessage(**msg) for msg in session.get("messages", [])]
+
+            await self._get_user_session(session_id, user_id)
+            messages = await MongoDB.get_collection(self.messages_collection)
+
+            # Messages still in this worker's write-behind buffer are merged in
+            pending = MessageWriter.pending(session_id)
+
+            query: Dict[str, Any] = {"session_id": session_id}
+            anchor_id = before or after
+            anchor = None
+            if anchor_id:
+                anchor = await messages.find_one(
+                    {"id": anchor_id, "session_id": session_id},
+                    {"timestamp": 1, "id": 1}
+                ) or next((msg for msg in pending if msg["id"] == anchor_id), None)
+                if not anchor:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail="Invalid message cursor"
+                    )
+                op = "$lt" if before else "$gt"
+                query["$or"] = [
+                    {"timestamp": {op: anchor["timestamp"]}},
+                    {"timestamp": anchor["timestamp"], "id": {op: anchor["id"]}}
+                ]
+
+            # Walk backwards from the newest message unless paging forwards
+            direction = ASCENDING if after else DESCENDING
+            cursor = messages.find(query, {"_id": 0, "user_id": 0}).sort(
+                [("timestamp", direction), ("id", direction)]
+            ).limit(limit)
+            documents = [msg async for msg in cursor]
+
+            if pending:
+                seen = {msg["id"] for msg in documents}
+                for msg in pending:
+                    if msg["id"] in seen:
+                        continue
+                    if anchor:
+                        position = (msg["timestamp"], msg["id"])
+                        boundary = (anchor["timestamp"], anchor["id"])
+                        if (before and position >= boundary) or (after and position <= boundary):
+                            continue
+                    msg.pop("user_id", None)
+                    documents.append(msg)
+                documents.sort(key=lambda msg: (msg["timestamp"], msg["id"]), reverse=direction == DESCENDING)
+                documents = documents[:limit]
+
+            page = [ChatMessage(**msg) for msg in documents]
+            if direction == DESCENDING:
+                page.reverse()
+            return page
         except HTTPException:
             raise
         except Exception as e:
@@ -141,4 +352,4 @@ class ChatService:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Failed to fetch session messages"
-            )
\ No newline at end of file
+            )
@@ -0,0 +1,174 @@
+from pydantic import BaseModel
+from pymongo import ASCENDING, DESCENDING
+from backend.core.config import settings
+from backend.database.mongodb import MongoDB
+from .message_writer import MessageWriter
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import asyncio
+import hashlib
+import json
+import logging
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except Exception:  # tiktoken is optional; fall back to a character estimate
+    _encoding = None
+
+
+def count_tokens(text: str) -> int:
+    """Count (or estimate) the tokens in a piece of text"""
+    if _encoding is not None:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return len(text) // 4 + 1
+
+
+class ConversationContext(BaseModel):
+    """The slice of a conversation sent to the model with a new message"""
+    summary: Optional[str] = None
+    messages: List[Dict[str, str]] = []
+
+    def interpreter_messages(self) -> List[Dict[str, str]]:
+        """Messages in interpreter format"""
+        return [{**message, "type": "message"} for message in self.messages]
+
+    def instructions(self) -> str:
+        """Extra system instructions carrying the rolling summary"""
+        if not self.summary:
+            return ""
+        return f"\n\nSummary of the earlier conversation:\n{self.summary}\n"
+
+    def fingerprint(self) -> str:
+        """Stable hash of the context, for keying caches on it"""
+        raw = json.dumps({"summary": self.summary, "messages": self.messages}, sort_keys=True)
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class ContextBuilder:
+    """
+    Assembles a token-budgeted prompt context from a session's stored messages.
+
+    The newest turns are sent verbatim within CONTEXT_TOKEN_BUDGET. Once the
+    unsummarized history grows past the budget, its oldest turns are folded
+    into a rolling summary kept on the session document (`summary`, plus
+    `summary_until` marking the last folded message), so prompt size stays
+    bounded however long the conversation gets.
+    """
+
+    def __init__(
+        self,
+        summarize: Callable[[Optional[str], List[Dict[str, str]]], Awaitable[str]],
+        token_budget: int = settings.CONTEXT_TOKEN_BUDGET
+    ):
+        self._summarize = summarize
+        self.token_budget = token_budget
+        self.sessions_collection = "chat_sessions"
+        self.messages_collection = "chat_messages"
+        self._folding: Dict[str, asyncio.Task] = {}
+
+    @staticmethod
+    def _to_turn(document: Dict[str, Any]) -> Dict[str, str]:
+        return {
+            "role": "user" if document.get("sender") == "user" else "assistant",
+            "content": document.get("text", ""),
+        }
+
+    @staticmethod
+    def _after(marker: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        if not marker:
+            return {}
+        return {"$or": [
+            {"timestamp": {"$gt": marker["timestamp"]}},
+            {"timestamp": marker["timestamp"], "id": {"$gt": marker["id"]}}
+        ]}
+
+    async def _session_summary(self, session_id: str) -> Dict[str, Any]:
+        sessions = await MongoDB.get_collection(self.sessions_collection)
+        return await sessions.find_one(
+            {"id": session_id},
+            {"_id": 0, "summary": 1, "summary_until": 1}
+        ) or {}
+
+    async def build(self, session_id: str, new_message: str) -> ConversationContext:
+        """Build the context for a new message in a session"""
+        session = await self._session_summary(session_id)
+        summary = session.get("summary")
+
+        remaining = self.token_budget - count_tokens(new_message) - count_tokens(summary or "")
+        messages = await MongoDB.get_collection(self.messages_collection)
+        cursor = messages.find(
+            {"session_id": session_id, **self._after(session.get("summary_until"))},
+            {"_id": 0, "id": 1, "sender": 1, "text": 1}
+        ).sort([("timestamp", DESCENDING), ("id", DESCENDING)])
+
+        # Walk back from the newest message until the budget is spent,
+        # starting with any not yet flushed from the write-behind buffer
+        pending = MessageWriter.pending(session_id)
+        pending_ids = {document["id"] for document in pending}
+
+        async def newest_first():
+            for document in reversed(pending):
+                yield document
+            async for document in cursor:
+                if document.get("id") not in pending_ids:
+                    yield document
+
+        turns: List[Dict[str, str]] = []
+        async for document in newest_first():
+            turn = self._to_turn(document)
+            remaining -= count_tokens(turn["content"])
+            if remaining < 0:
+                break
+            turns.append(turn)
+        turns.reverse()
+        return ConversationContext(summary=summary, messages=turns)
+
+    async def fold(self, session_id: str) -> None:
+        """Fold the oldest unsummarized turns into the summary if history is over budget"""
+        session = await self._session_summary(session_id)
+        messages = await MongoDB.get_collection(self.messages_collection)
+        documents = await messages.find(
+            {"session_id": session_id, **self._after(session.get("summary_until"))},
+            {"_id": 0, "id": 1, "timestamp": 1, "sender": 1, "text": 1}
+        ).sort([("timestamp", ASCENDING), ("id", ASCENDING)]).to_list(None)
+
+        sizes = [count_tokens(document.get("text", "")) for document in documents]
+        total = sum(sizes)
+        if total <= self.token_budget:
+            return
+
+        # Fold until the verbatim window is back to half the budget
+        folded = 0
+        while folded < len(documents) - 1 and total > self.token_budget // 2:
+            total -= sizes[folded]
+            folded += 1
+        if not folded:
+            return
+
+        to_fold = documents[:folded]
+        summary = await self._summarize(session.get("summary"), [self._to_turn(d) for d in to_fold])
+        last = to_fold[-1]
+        sessions = await MongoDB.get_collection(self.sessions_collection)
+        await sessions.update_one(
+            {"id": session_id},
+            {"$set": {
+                "summary": summary,
+                "summary_until": {"timestamp": last["timestamp"], "id": last["id"]}
+            }}
+        )
+        logging.info(f"Folded {folded} messages into the summary for session {session_id}")
+
+    def schedule_fold(self, session_id: str) -> None:
+        """Update the session's summary in the background, at most once at a time per session"""
+        if session_id in self._folding:
+            return
+
+        async def run():
+            try:
+                await self.fold(session_id)
+            except Exception as e:
+                logging.error(f"Failed to update summary for session {session_id}: {str(e)}")
+            finally:
+                self._folding.pop(session_id, None)
+
+        self._folding[session_id] = asyncio.create_task(run())
@@ -0,0 +1,160 @@
+from fastapi import HTTPException, status
+from pymongo import ASCENDING
+from backend.core.config import settings
+from backend.core.responses import dumps
+from backend.database.mongodb import MongoDB
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Optional
+import csv
+import io
+import logging
+import zlib
+from .message_migration import MessageMigration
+from .message_writer import MessageWriter
+
+CSV_COLUMNS = ["session_id", "session_title", "message_id", "timestamp", "sender", "text"]
+# Spreadsheets evaluate cells starting with these as formulas
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _csv_cell(value: Any) -> Any:
+    """Neutralize user-supplied text that a spreadsheet would run as a formula"""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+class ExportService:
+    """
+    Streams a user's chat history as NDJSON or CSV without holding it in memory.
+
+    Sessions and then each session's messages are read from Motor cursors in
+    batches of EXPORT_BATCH_SIZE documents (messages through the
+    session_timeline index) and encoded into chunks of about
+    EXPORT_CHUNK_BYTES. Each chunk is only produced once the previous one has
+    been sent, so a slow client slows the export down rather than letting it
+    pile up in the worker. With gzip, chunks pass through one incremental
+    zlib compressor.
+
+    NDJSON has one `{"type": "session"}` line per session followed by a
+    `{"type": "message"}` line per message; CSV has one row per message, with
+    text that a spreadsheet would run as a formula prefixed by a quote.
+    """
+
+    def __init__(self):
+        self.sessions_collection = "chat_sessions"
+        self.messages_collection = "chat_messages"
+
+    async def open_export(
+        self,
+        user_id: str,
+        export_format: str,
+        compress: bool = False,
+        session_id: Optional[str] = None
+    ) -> AsyncIterator[bytes]:
+        """Validate the request, then return the export byte stream"""
+        if session_id:
+            sessions = await MongoDB.get_collection(self.sessions_collection)
+            if not await sessions.find_one({"id": session_id, "user_id": user_id}, {"_id": 1}):
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Chat session not found"
+                )
+        # Buffered messages would otherwise be missing from the export
+        if MessageWriter.enabled():
+            await MessageWriter.flush()
+        # So would history still embedded in sessions not yet migrated
+        query: Dict[str, Any] = {"user_id": user_id}
+        if session_id:
+            query["id"] = session_id
+        try:
+            await MessageMigration.run(query)
+        except Exception as e:
+            logging.error(f"Failed to migrate embedded messages for export: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to prepare chat export"
+            )
+
+        chunks = self._csv(user_id, session_id) if export_format == "csv" else self._ndjson(user_id, session_id)
+        return self._gzip(chunks) if compress else chunks
+
+    async def _sessions(self, user_id: str, session_id: Optional[str]) -> AsyncIterator[Dict[str, Any]]:
+        sessions = await MongoDB.get_collection(self.sessions_collection)
+        query: Dict[str, Any] = {"user_id": user_id}
+        if session_id:
+            query["id"] = session_id
+        cursor = sessions.find(
+            query,
+            {"_id": 0, "messages": 0, "summary": 0, "summary_until": 0}
+        ).sort([("timestamp", ASCENDING), ("id", ASCENDING)]).batch_size(settings.EXPORT_BATCH_SIZE)
+        async for session in cursor:
+            yield session
+
+    async def _messages(self, session_id: str) -> AsyncIterator[Dict[str, Any]]:
+        messages = await MongoDB.get_collection(self.messages_collection)
+        cursor = messages.find(
+            {"session_id": session_id},
+            {"_id": 0, "user_id": 0}
+        ).sort([("timestamp", ASCENDING), ("id", ASCENDING)]).batch_size(settings.EXPORT_BATCH_SIZE)
+        async for message in cursor:
+            yield message
+
+    async def _ndjson(self, user_id: str, session_id: Optional[str]) -> AsyncIterator[bytes]:
+        buffer = bytearray()
+        try:
+            async for session in self._sessions(user_id, session_id):
+                buffer += dumps({"type": "session", **session}) + b"\n"
+                async for message in self._messages(session["id"]):
+                    buffer += dumps({"type": "message", **message}) + b"\n"
+                    if len(buffer) >= settings.EXPORT_CHUNK_BYTES:
+                        yield bytes(buffer)
+                        buffer.clear()
+            if buffer:
+                yield bytes(buffer)
+        except Exception as e:
+            # Headers are already sent; end the stream with a marker instead of a status code
+            logging.error(f"Chat export failed for user {user_id}: {str(e)}")
+            yield bytes(buffer) + dumps({"type": "error", "detail": "Export failed"}) + b"\n"
+
+    async def _csv(self, user_id: str, session_id: Optional[str]) -> AsyncIterator[bytes]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(CSV_COLUMNS)
+        try:
+            async for session in self._sessions(user_id, session_id):
+                async for message in self._messages(session["id"]):
+                    timestamp = message.get("timestamp")
+                    writer.writerow([
+                        session["id"],
+                        _csv_cell(session.get("title", "")),
+                        message.get("id", ""),
+                        timestamp.isoformat() if isinstance(timestamp, datetime) else timestamp,
+                        _csv_cell(message.get("sender", "")),
+                        _csv_cell(message.get("text", "")),
+                    ])
+                    if buffer.tell() >= settings.EXPORT_CHUNK_BYTES:
+                        yield self._drain(buffer)
+            if buffer.tell():
+                yield self._drain(buffer)
+        except Exception as e:
+            logging.error(f"Chat export failed for user {user_id}: {str(e)}")
+            # A truncated CSV must not look complete
+            yield self._drain(buffer) + b"# export failed\n"
+
+    @staticmethod
+    def _drain(buffer: io.StringIO) -> bytes:
+        data = buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate(0)
+        return data
+
+    @staticmethod
+    async def _gzip(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        # wbits=31 produces a gzip container rather than raw zlib
+        compressor = zlib.compressobj(settings.EXPORT_GZIP_LEVEL, zlib.DEFLATED, 31)
+        async for chunk in chunks:
+            compressed = compressor.compress(chunk)
+            if compressed:
+                yield compressed
+        yield compressor.flush()
@@ -0,0 +1,180 @@
+from collections import OrderedDict, deque
+from fastapi import HTTPException, status
+from backend.core.config import settings
+from backend.core.metrics import AI_ADMISSION_REJECTED, AI_EXECUTOR_QUEUED, AI_QUEUE_WAIT
+from typing import Deque, Dict, Optional
+import asyncio
+import time
+
+# Lower tiers are always served first
+TIER_PRIORITY = 0
+TIER_NORMAL = 1
+TIER_BACKGROUND = 2
+
+
+class _Waiter:
+    __slots__ = ("future", "user_id", "session_id", "tier", "queued")
+
+    def __init__(self, future: asyncio.Future, user_id: str, session_id: str, tier: int):
+        self.future = future
+        self.user_id = user_id
+        self.session_id = session_id
+        self.tier = tier
+        self.queued = True
+
+
+class FairScheduler:
+    """
+    Admission control and fair ordering for the AI executor's slots.
+
+    At most `slots` jobs run at once. Waiting jobs are kept per priority tier,
+    then per user, then per session, and handed slots round-robin: each user
+    with queued work gets a turn before anyone gets a second one, and within
+    a user their sessions take turns. The queue is bounded overall
+    (AI_QUEUE_MAX_SIZE, 503) and, except for background jobs, per user
+    (AI_QUEUE_MAX_PER_USER, 429), and a job waiting longer than
+    AI_QUEUE_MAX_WAIT gives up with 503; all rejections carry Retry-After so
+    overload fails fast and predictably.
+    """
+
+    def __init__(
+        self,
+        slots: int,
+        max_queue: int = settings.AI_QUEUE_MAX_SIZE,
+        max_per_user: int = settings.AI_QUEUE_MAX_PER_USER,
+        max_wait: float = settings.AI_QUEUE_MAX_WAIT
+    ):
+        self.slots = slots
+        self.max_queue = max_queue
+        self.max_per_user = max_per_user
+        self.max_wait = max_wait
+        self._active = 0
+        self._waiting = 0
+        self._per_user: Dict[str, int] = {}
+        self._tiers: Dict[int, "OrderedDict[str, OrderedDict[str, Deque[_Waiter]]]"] = {}
+
+    @staticmethod
+    def tier_for(user_id: str) -> int:
+        """Priority tier of a user's interactive requests"""
+        return TIER_PRIORITY if user_id in settings.AI_PRIORITY_USER_IDS else TIER_NORMAL
+
+    def _reject(self, status_code: int, reason: str, detail: str) -> HTTPException:
+        AI_ADMISSION_REJECTED.labels(reason).inc()
+        return HTTPException(
+            status_code=status_code,
+            detail=detail,
+            headers={"Retry-After": str(settings.AI_QUEUE_RETRY_AFTER)},
+        )
+
+    def check(self, user_id: str, tier: Optional[int] = None) -> None:
+        """Raise if a new job from this user would be turned away right now"""
+        if self._active < self.slots and not self._waiting:
+            return
+        if self._waiting >= self.max_queue:
+            raise self._reject(
+                status.HTTP_503_SERVICE_UNAVAILABLE, "queue_full", "AI service is busy, please try again"
+            )
+        # Background work is not on behalf of one user, so only the global bound applies
+        if tier != TIER_BACKGROUND and self._per_user.get(user_id, 0) >= self.max_per_user:
+            raise self._reject(
+                status.HTTP_429_TOO_MANY_REQUESTS, "user_queue_full", "Too many AI requests in progress"
+            )
+
+    async def acquire(self, user_id: str, session_id: Optional[str] = None, tier: Optional[int] = None) -> None:
+        """Wait for an execution slot; pair every successful acquire with release()"""
+        if tier is None:
+            tier = self.tier_for(user_id)
+        self.check(user_id, tier)
+        if self._active < self.slots and not self._waiting:
+            self._active += 1
+            AI_QUEUE_WAIT.observe(0)
+            return
+
+        waiter = _Waiter(asyncio.get_running_loop().create_future(), user_id, session_id or "", tier)
+        self._enqueue(waiter)
+        queued = time.perf_counter()
+        try:
+            await asyncio.wait_for(waiter.future, timeout=self.max_wait)
+        except BaseException as e:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Granted a slot just as we gave up; pass it on
+                self.release()
+            else:
+                self._dequeue(waiter)
+            if isinstance(e, asyncio.TimeoutError):
+                raise self._reject(
+                    status.HTTP_503_SERVICE_UNAVAILABLE, "queue_timeout", "AI service is busy, please try again"
+                )
+            raise
+        AI_QUEUE_WAIT.observe(time.perf_counter() - queued)
+
+    def release(self) -> None:
+        """Free a slot and hand it to the next waiter in fair order"""
+        self._active -= 1
+        while self._active < self.slots:
+            waiter = self._next()
+            if waiter is None:
+                return
+            if not waiter.future.done():
+                self._active += 1
+                waiter.future.set_result(None)
+
+    def _enqueue(self, waiter: _Waiter) -> None:
+        users = self._tiers.setdefault(waiter.tier, OrderedDict())
+        sessions = users.setdefault(waiter.user_id, OrderedDict())
+        sessions.setdefault(waiter.session_id, deque()).append(waiter)
+        self._waiting += 1
+        self._per_user[waiter.user_id] = self._per_user.get(waiter.user_id, 0) + 1
+        AI_EXECUTOR_QUEUED.inc()
+
+    def _dequeue(self, waiter: _Waiter) -> None:
+        if not waiter.queued:
+            return
+        users = self._tiers[waiter.tier]
+        sessions = users[waiter.user_id]
+        sessions[waiter.session_id].remove(waiter)
+        if not sessions[waiter.session_id]:
+            del sessions[waiter.session_id]
+        if not sessions:
+            del users[waiter.user_id]
+        if not users:
+            del self._tiers[waiter.tier]
+        self._forget(waiter)
+
+    def _forget(self, waiter: _Waiter) -> None:
+        waiter.queued = False
+        self._waiting -= 1
+        remaining = self._per_user[waiter.user_id] - 1
+        if remaining:
+            self._per_user[waiter.user_id] = remaining
+        else:
+            del self._per_user[waiter.user_id]
+        AI_EXECUTOR_QUEUED.dec()
+
+    def _next(self) -> Optional[_Waiter]:
+        """Pop the next waiter: lowest tier, then the user and session whose turn it is"""
+        if not self._tiers:
+            return None
+        tier = min(self._tiers)
+        users = self._tiers[tier]
+        user_id, sessions = next(iter(users.items()))
+        session_id, waiters = next(iter(sessions.items()))
+        waiter = waiters.popleft()
+
+        # Rotate both the session and the user to the back of their queues
+        if waiters:
+            sessions.move_to_end(session_id)
+        else:
+            del sessions[session_id]
+        if sessions:
+            users.move_to_end(user_id)
+        else:
+            del users[user_id]
+        if not users:
+            del self._tiers[tier]
+
+        self._forget(waiter)
+        return waiter
+
+    def stats(self) -> Dict[str, int]:
+        return {"slots": self.slots, "active": self._active, "waiting": self._waiting}
@@ -0,0 +1,100 @@
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+import asyncio
+import logging
+import time
+
+
+class PooledInterpreter:
+    """An interpreter instance bound to a single chat session"""
+
+    def __init__(self, session_id: str, interpreter: Any):
+        self.session_id = session_id
+        self.interpreter = interpreter
+        self.lock = asyncio.Lock()
+        self.users = 0
+        self.last_used = time.monotonic()
+
+
+class InterpreterPool:
+    """
+    Bounded pool of interpreter instances keyed by chat session.
+
+    Sessions get their own interpreter so concurrent chats never share an
+    object, and a session's requests run one at a time. The pool holds no
+    conversation state of its own: every request loads the interpreter with
+    the context built from stored history. Idle instances are evicted in LRU
+    order when the pool is over its size, or once they have been idle longer
+    than the idle timeout.
+    """
+
+    def __init__(self, factory: Callable[[], Any], max_size: int, idle_timeout: float):
+        self._factory = factory
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self._entries: "OrderedDict[str, PooledInterpreter]" = OrderedDict()
+        self.evictions = 0
+
+    async def acquire(self, session_id: str) -> PooledInterpreter:
+        """Get exclusive use of the session's interpreter, creating it if needed"""
+        self._evict_idle()
+
+        entry = self._entries.get(session_id)
+        if entry is None:
+            entry = PooledInterpreter(session_id, self._factory())
+            self._entries[session_id] = entry
+            logging.debug(f"Created interpreter for session {session_id}")
+
+        self._entries.move_to_end(session_id)
+        entry.users += 1
+        try:
+            await entry.lock.acquire()
+        except BaseException:
+            entry.users -= 1
+            raise
+        entry.last_used = time.monotonic()
+        self._enforce_limits()
+        return entry
+
+    def release(self, entry: PooledInterpreter) -> None:
+        """Return an interpreter to the pool"""
+        entry.last_used = time.monotonic()
+        entry.users -= 1
+        entry.lock.release()
+        self._enforce_limits()
+
+    def get(self, session_id: str) -> Optional[PooledInterpreter]:
+        """Get the resident interpreter for a session without acquiring it"""
+        return self._entries.get(session_id)
+
+    def discard(self, session_id: str) -> None:
+        """Drop a session's interpreter so the next request gets a fresh one"""
+        entry = self._entries.get(session_id)
+        if entry is not None and entry.users == 0:
+            del self._entries[session_id]
+
+    def _evict(self, session_id: str) -> None:
+        del self._entries[session_id]
+        self.evictions += 1
+
+    def _evict_idle(self) -> None:
+        now = time.monotonic()
+        for session_id, entry in list(self._entries.items()):
+            if entry.users == 0 and now - entry.last_used > self.idle_timeout:
+                self._evict(session_id)
+
+    def _enforce_limits(self) -> None:
+        """Evict least recently used idle interpreters until within the size cap"""
+        for session_id, entry in list(self._entries.items()):
+            if len(self._entries) <= self.max_size:
+                break
+            if entry.users == 0:
+                self._evict(session_id)
+
+    def stats(self) -> Dict[str, int]:
+        """Get pool occupancy statistics"""
+        return {
+            "size": len(self._entries),
+            "in_use": sum(1 for entry in self._entries.values() if entry.users),
+            "evictions": self.evictions,
+        }
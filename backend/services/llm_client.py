@@ -0,0 +1,87 @@
+from backend.core.config import settings
+from typing import Optional, AsyncIterator, List, Dict, Any
+import httpx
+import json
+import logging
+import os
+
+
+class LLMClient:
+    """
+    Native asyncio client for OpenAI-compatible chat completions.
+
+    One httpx.AsyncClient is shared per worker, so requests reuse pooled
+    keep-alive (and, where the server supports it, HTTP/2) connections instead
+    of paying a TLS handshake per call, and concurrency is bounded only by the
+    pool limits rather than a thread count. Used for plain chat; anything that
+    needs code execution stays on the interpreter.
+    """
+
+    client: Optional[httpx.AsyncClient] = None
+
+    @classmethod
+    def connect(cls, verify: Any = True) -> httpx.AsyncClient:
+        """Create the shared HTTP client"""
+        if cls.client is None:
+            cls.client = httpx.AsyncClient(
+                base_url=settings.OPENAI_API_BASE or "https://api.openai.com/v1",
+                headers={"Authorization": f"Bearer {os.environ.get('OPENAI_API_KEY', '')}"},
+                http2=settings.LLM_HTTP2,
+                verify=verify,
+                limits=httpx.Limits(
+                    max_connections=settings.LLM_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.LLM_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=settings.LLM_KEEPALIVE_EXPIRY,
+                ),
+                timeout=httpx.Timeout(
+                    settings.LLM_READ_TIMEOUT,
+                    connect=settings.LLM_CONNECT_TIMEOUT,
+                    pool=settings.LLM_POOL_TIMEOUT,
+                ),
+            )
+            logging.info("Created shared LLM HTTP client")
+        return cls.client
+
+    @classmethod
+    async def close(cls) -> None:
+        """Close the shared HTTP client"""
+        if cls.client is not None:
+            await cls.client.aclose()
+            cls.client = None
+            logging.info("LLM HTTP client closed")
+
+    @classmethod
+    async def chat(cls, messages: List[Dict[str, str]], model: str, temperature: float) -> str:
+        """Get a complete chat completion"""
+        response = await cls.connect().post(
+            "/chat/completions",
+            json={"model": model, "temperature": temperature, "messages": messages},
+        )
+        response.raise_for_status()
+        return response.json()["choices"][0]["message"].get("content") or ""
+
+    @classmethod
+    async def stream_chat(
+        cls,
+        messages: List[Dict[str, str]],
+        model: str,
+        temperature: float
+    ) -> AsyncIterator[str]:
+        """Stream a chat completion's content deltas as they arrive"""
+        async with cls.connect().stream(
+            "POST",
+            "/chat/completions",
+            json={"model": model, "temperature": temperature, "messages": messages, "stream": True},
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                choices = json.loads(data).get("choices") or []
+                if choices:
+                    content = choices[0].get("delta", {}).get("content")
+                    if content:
+                        yield content
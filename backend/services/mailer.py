@@ -0,0 +1,242 @@
+from email.message import EmailMessage
+from backend.core.config import settings
+from backend.core.metrics import MAIL_DELIVERIES
+from backend.database.redis import RedisClient
+from typing import Any, Dict, List, Optional, Set
+import aiosmtplib
+import asyncio
+import json
+import logging
+import os
+import socket
+import time
+import uuid
+
+
+class Mailer:
+    """
+    Redis-backed outbox and async SMTP delivery worker.
+
+    `enqueue` only pushes the message onto the `mail:outbox` list, so request
+    handlers never touch SMTP. Each worker process runs one delivery loop
+    that claims messages into its own processing list (BLMOVE), sends them
+    in batches over a single authenticated connection kept open between
+    batches, and reschedules failures on the `mail:retry` sorted set with
+    exponential backoff until MAIL_MAX_ATTEMPTS, after which they are parked
+    on `mail:dead`. Consumers refresh a heartbeat before each message; one
+    that dies mid-batch stops refreshing it, and its claimed messages are
+    returned to the outbox by the surviving workers.
+
+    For local testing, point SMTP_SERVER/SMTP_PORT at a sink such as
+    `python -m aiosmtpd -n -l 127.0.0.1:1025` with SMTP_TLS and SMTP_AUTH off.
+    """
+
+    outbox = "mail:outbox"
+    retry_queue = "mail:retry"
+    dead_letters = "mail:dead"
+    processing_prefix = "mail:processing:"
+    heartbeat_prefix = "mail:consumer:"
+    # Refreshed before every message, so it must outlast one message's worst case:
+    # connect, STARTTLS, login and send, each bounded by MAIL_SMTP_TIMEOUT
+    heartbeat_ttl = max(30, settings.MAIL_SMTP_TIMEOUT * 4 + 10)
+    recover_interval = 60
+
+    consumer_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+    _worker_task: Optional[asyncio.Task] = None
+    _stopping = False
+    _smtp: Optional[aiosmtplib.SMTP] = None
+    _smtp_last_used = 0.0
+    # Direct sends made while Redis is unavailable, kept referenced until done
+    _direct_sends: Set[asyncio.Task] = set()
+
+    @classmethod
+    def _processing(cls) -> str:
+        return f"{cls.processing_prefix}{cls.consumer_id}"
+
+    @classmethod
+    async def enqueue(cls, recipient: str, subject: str, body: str) -> None:
+        """Queue an email for delivery"""
+        payload = {
+            "id": uuid.uuid4().hex,
+            "to": recipient,
+            "subject": subject,
+            "body": body,
+            "attempts": 0,
+        }
+        try:
+            await RedisClient.redis.lpush(cls.outbox, json.dumps(payload))
+        except Exception as e:
+            logging.error(f"Mail outbox unavailable, sending directly: {str(e)}")
+            task = asyncio.create_task(cls._send_direct(payload))
+            cls._direct_sends.add(task)
+            task.add_done_callback(cls._direct_sends.discard)
+
+    @staticmethod
+    def _message(payload: Dict[str, Any]) -> EmailMessage:
+        message = EmailMessage()
+        message["From"] = settings.SMTP_FROM or settings.SMTP_USERNAME
+        message["To"] = payload["to"]
+        message["Subject"] = payload["subject"]
+        message["Message-ID"] = f"<{payload['id']}@{socket.gethostname()}>"
+        message.set_content(payload["body"])
+        return message
+
+    @staticmethod
+    def _client() -> aiosmtplib.SMTP:
+        return aiosmtplib.SMTP(
+            hostname=settings.SMTP_SERVER,
+            port=settings.SMTP_PORT,
+            start_tls=settings.SMTP_TLS,
+            timeout=settings.MAIL_SMTP_TIMEOUT,
+        )
+
+    @classmethod
+    async def _connect(cls) -> aiosmtplib.SMTP:
+        """Reuse the open SMTP session, reconnecting if it has gone idle or away"""
+        idle = time.monotonic() - cls._smtp_last_used
+        if cls._smtp is not None and (not cls._smtp.is_connected or idle > settings.MAIL_CONNECTION_IDLE):
+            await cls._disconnect()
+        if cls._smtp is None:
+            smtp = cls._client()
+            await smtp.connect()
+            if settings.SMTP_AUTH:
+                await smtp.login(settings.SMTP_USERNAME, settings.SMTP_PASSWORD)
+            cls._smtp = smtp
+        return cls._smtp
+
+    @classmethod
+    async def _disconnect(cls) -> None:
+        if cls._smtp is not None:
+            try:
+                await cls._smtp.quit()
+            except Exception:
+                cls._smtp.close()
+            cls._smtp = None
+
+    @classmethod
+    async def _send_direct(cls, payload: Dict[str, Any]) -> None:
+        try:
+            async with cls._client() as smtp:
+                if settings.SMTP_AUTH:
+                    await smtp.login(settings.SMTP_USERNAME, settings.SMTP_PASSWORD)
+                await smtp.send_message(cls._message(payload))
+            MAIL_DELIVERIES.labels("sent").inc()
+        except Exception as e:
+            MAIL_DELIVERIES.labels("dead").inc()
+            logging.error(f"Failed to send email to {payload['to']}: {str(e)}")
+
+    @classmethod
+    async def _claim_batch(cls) -> List[str]:
+        """Move up to MAIL_BATCH_SIZE messages from the outbox to this consumer's processing list"""
+        first = await RedisClient.redis.blmove(cls.outbox, cls._processing(), 5, "RIGHT", "LEFT")
+        if first is None:
+            return []
+        batch = [first]
+        while len(batch) < settings.MAIL_BATCH_SIZE:
+            raw = await RedisClient.redis.lmove(cls.outbox, cls._processing(), "RIGHT", "LEFT")
+            if raw is None:
+                break
+            batch.append(raw)
+        return batch
+
+    @classmethod
+    async def _heartbeat(cls) -> None:
+        await RedisClient.redis.set(f"{cls.heartbeat_prefix}{cls.consumer_id}", 1, ex=cls.heartbeat_ttl)
+
+    @classmethod
+    async def _deliver(cls, batch: List[str]) -> None:
+        for raw in batch:
+            # A slow SMTP server can stretch a batch far past the TTL; keep our claim alive
+            await cls._heartbeat()
+            payload = json.loads(raw)
+            try:
+                smtp = await cls._connect()
+                await smtp.send_message(cls._message(payload))
+                cls._smtp_last_used = time.monotonic()
+                MAIL_DELIVERIES.labels("sent").inc()
+                logging.info(f"Email {payload['id']} sent to {payload['to']}")
+            except Exception as e:
+                # The session may be unusable now; the next message reconnects
+                await cls._disconnect()
+                await cls._reschedule(payload, str(e))
+            await RedisClient.redis.lrem(cls._processing(), 1, raw)
+
+    @classmethod
+    async def _reschedule(cls, payload: Dict[str, Any], error: str) -> None:
+        payload = {**payload, "attempts": payload["attempts"] + 1, "last_error": error}
+        if payload["attempts"] >= settings.MAIL_MAX_ATTEMPTS:
+            MAIL_DELIVERIES.labels("dead").inc()
+            logging.error(f"Giving up on email {payload['id']} to {payload['to']}: {error}")
+            await RedisClient.redis.lpush(cls.dead_letters, json.dumps(payload))
+            return
+        delay = min(settings.MAIL_RETRY_BASE_DELAY * 2 ** (payload["attempts"] - 1), settings.MAIL_RETRY_MAX_DELAY)
+        MAIL_DELIVERIES.labels("retried").inc()
+        logging.warning(f"Email {payload['id']} failed (attempt {payload['attempts']}), retrying in {delay}s: {error}")
+        await RedisClient.redis.zadd(cls.retry_queue, {json.dumps(payload): time.time() + delay})
+
+    @classmethod
+    async def _release_due_retries(cls) -> None:
+        due = await RedisClient.redis.zrangebyscore(cls.retry_queue, 0, time.time(), start=0, num=100)
+        for raw in due:
+            # Only the worker whose ZREM succeeds requeues it
+            if await RedisClient.redis.zrem(cls.retry_queue, raw):
+                await RedisClient.redis.lpush(cls.outbox, raw)
+
+    @classmethod
+    async def _recover_orphans(cls) -> None:
+        """Return messages claimed by consumers that stopped heartbeating to the outbox"""
+        async for key in RedisClient.redis.scan_iter(match=f"{cls.processing_prefix}*"):
+            consumer = key[len(cls.processing_prefix):]
+            if consumer == cls.consumer_id or await RedisClient.redis.exists(f"{cls.heartbeat_prefix}{consumer}"):
+                continue
+            moved = 0
+            while await RedisClient.redis.lmove(key, cls.outbox, "RIGHT", "LEFT") is not None:
+                moved += 1
+            if moved:
+                logging.warning(f"Recovered {moved} emails from stopped mail consumer {consumer}")
+
+    @classmethod
+    async def _run(cls) -> None:
+        delay = 1
+        last_recovery = 0.0
+        while not cls._stopping:
+            try:
+                await cls._heartbeat()
+                if time.monotonic() - last_recovery > cls.recover_interval:
+                    await cls._recover_orphans()
+                    last_recovery = time.monotonic()
+                await cls._release_due_retries()
+                batch = await cls._claim_batch()
+                if batch:
+                    await cls._deliver(batch)
+                elif cls._smtp is not None and time.monotonic() - cls._smtp_last_used > settings.MAIL_CONNECTION_IDLE:
+                    await cls._disconnect()
+                delay = 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"Mail worker error: {str(e)}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30)
+
+    @classmethod
+    def start(cls) -> None:
+        """Start this worker's delivery loop"""
+        if RedisClient.redis and cls._worker_task is None:
+            cls._stopping = False
+            cls._worker_task = asyncio.create_task(cls._run())
+            logging.info(f"Started mail delivery worker {cls.consumer_id}")
+
+    @classmethod
+    async def stop(cls) -> None:
+        """Let the current batch finish, then stop the delivery loop"""
+        if cls._worker_task is not None:
+            cls._stopping = True
+            try:
+                await asyncio.wait_for(cls._worker_task, timeout=settings.MAIL_SHUTDOWN_TIMEOUT)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                pass
+            cls._worker_task = None
+        await cls._disconnect()
+        if cls._direct_sends:
+            await asyncio.gather(*cls._direct_sends, return_exceptions=True)
@@ -0,0 +1,67 @@
+from pymongo import ASCENDING
+from pymongo.errors import BulkWriteError
+from backend.core.config import settings
+from backend.database.mongodb import MongoDB
+from typing import Any, Dict, Optional
+import logging
+
+
+class MessageMigration:
+    """
+    Moves legacy sessions' embedded `messages` arrays into chat_messages.
+
+    Every reader of chat history (session pages, search, export) reads only
+    chat_messages, so embedded history is invisible until it is migrated.
+    Sessions are processed in batches, each with one insert and one update.
+    Embedded messages without an id get one derived from the session and
+    their position, so concurrent runs insert identical documents and the
+    unique message id index drops the duplicates.
+    """
+
+    sessions_collection = "chat_sessions"
+    messages_collection = "chat_messages"
+
+    @classmethod
+    async def run(
+        cls,
+        query: Optional[Dict[str, Any]] = None,
+        batch_size: int = settings.MESSAGE_MIGRATION_BATCH_SIZE
+    ) -> int:
+        """Migrate every legacy session matching query; returns the number of sessions migrated"""
+        sessions = await MongoDB.get_collection(cls.sessions_collection)
+        messages = await MongoDB.get_collection(cls.messages_collection)
+        migrated = 0
+        last_id = None
+        while True:
+            batch_query: Dict[str, Any] = {**(query or {}), "messages": {"$exists": True}}
+            if last_id is not None:
+                batch_query["_id"] = {"$gt": last_id}
+            batch = await sessions.find(
+                batch_query, {"_id": 1, "id": 1, "user_id": 1, "messages": 1}
+            ).sort("_id", ASCENDING).limit(batch_size).to_list(batch_size)
+            if not batch:
+                return migrated
+            last_id = batch[-1]["_id"]
+
+            documents = []
+            for session in batch:
+                for position, msg in enumerate(session.get("messages") or []):
+                    documents.append({
+                        **msg,
+                        "id": msg.get("id") or f"{session['id']}-{position}",
+                        "session_id": session["id"],
+                        "user_id": session["user_id"],
+                    })
+            if documents:
+                try:
+                    await messages.insert_many(documents, ordered=False)
+                except BulkWriteError as e:
+                    # Duplicate ids are messages another run already migrated
+                    if any(error.get("code") != 11000 for error in e.details.get("writeErrors", [])):
+                        raise
+            await sessions.update_many(
+                {"_id": {"$in": [session["_id"] for session in batch]}},
+                {"$unset": {"messages": ""}}
+            )
+            migrated += len(batch)
+            logging.info(f"Migrated {len(documents)} embedded messages from {len(batch)} sessions")
@@ -0,0 +1,134 @@
+from pymongo import InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError
+from backend.core.config import settings
+from backend.core.metrics import MESSAGE_FLUSH_SIZE
+from backend.database.mongodb import MongoDB
+from typing import Any, Dict, List, Optional
+import asyncio
+import logging
+
+
+class MessageWriter:
+    """
+    Optional per-worker write-behind buffer for chat message appends.
+
+    With WRITE_BEHIND_ENABLED, new messages and the matching session updates
+    are queued in memory and written as one bulk_write per collection once
+    WRITE_BEHIND_BATCH_SIZE messages are pending or WRITE_BEHIND_FLUSH_INTERVAL
+    seconds have passed, instead of two round trips per exchange. Session
+    updates are coalesced so a busy session costs one update per flush.
+
+    Messages not yet written are served from `pending()` so this worker reads
+    its own writes. The buffer is flushed on shutdown; a crash can lose up to
+    one interval of messages, which is why the buffer is off by default.
+    """
+
+    messages_collection = "chat_messages"
+    sessions_collection = "chat_sessions"
+    _messages: List[Dict[str, Any]] = []
+    _session_updates: Dict[str, Dict[str, Any]] = {}
+    # Taken out of the buffer but not yet acknowledged by the database
+    _inflight: List[Dict[str, Any]] = []
+    _lock: Optional[asyncio.Lock] = None
+    _flush_task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def enabled(cls) -> bool:
+        return settings.WRITE_BEHIND_ENABLED
+
+    @classmethod
+    async def append(cls, documents: List[Dict[str, Any]], session_id: str, session_update: Dict[str, Any]) -> None:
+        """Persist message documents and a `$set` on their session, now or in the next batch"""
+        if not cls.enabled():
+            messages = await MongoDB.get_collection(cls.messages_collection)
+            await messages.insert_many(documents)
+            sessions = await MongoDB.get_collection(cls.sessions_collection)
+            await sessions.update_one({"id": session_id}, {"$set": session_update})
+            return
+
+        cls._messages.extend(documents)
+        cls._session_updates.setdefault(session_id, {}).update(session_update)
+        if len(cls._messages) >= settings.WRITE_BEHIND_BATCH_SIZE:
+            await cls.flush()
+
+    @classmethod
+    def pending(cls, session_id: str) -> List[Dict[str, Any]]:
+        """This worker's unwritten messages for a session, oldest first"""
+        if not cls.enabled():
+            return []
+        return [
+            dict(document) for document in cls._inflight + cls._messages
+            if document["session_id"] == session_id
+        ]
+
+    @classmethod
+    async def flush(cls) -> None:
+        """Write everything buffered so far"""
+        if cls._lock is None:
+            cls._lock = asyncio.Lock()
+        async with cls._lock:
+            if not cls._messages and not cls._session_updates:
+                return
+            cls._inflight, cls._messages = cls._messages, []
+            session_updates, cls._session_updates = cls._session_updates, {}
+            try:
+                await cls._write(cls._inflight, session_updates)
+            except Exception as e:
+                logging.error(f"Failed to flush {len(cls._inflight)} buffered messages: {str(e)}")
+                # Keep them for the next flush; duplicates from a partial write are skipped then
+                cls._messages = cls._inflight + cls._messages
+                for session_id, update in session_updates.items():
+                    cls._session_updates[session_id] = {**update, **cls._session_updates.get(session_id, {})}
+                raise
+            finally:
+                cls._inflight = []
+
+    @classmethod
+    async def _write(cls, documents: List[Dict[str, Any]], session_updates: Dict[str, Dict[str, Any]]) -> None:
+        if documents:
+            messages = await MongoDB.get_collection(cls.messages_collection)
+            try:
+                await messages.bulk_write([InsertOne(dict(document)) for document in documents], ordered=False)
+            except BulkWriteError as e:
+                # Already written by an earlier, partly failed flush
+                if any(error.get("code") != 11000 for error in e.details.get("writeErrors", [])):
+                    raise
+            MESSAGE_FLUSH_SIZE.observe(len(documents))
+        if session_updates:
+            sessions = await MongoDB.get_collection(cls.sessions_collection)
+            await sessions.bulk_write(
+                [UpdateOne({"id": session_id}, {"$set": update}) for session_id, update in session_updates.items()],
+                ordered=False
+            )
+
+    @classmethod
+    async def _flush_periodically(cls) -> None:
+        while True:
+            await asyncio.sleep(settings.WRITE_BEHIND_FLUSH_INTERVAL)
+            try:
+                await cls.flush()
+            except Exception:
+                pass  # Logged by flush; retried on the next tick
+
+    @classmethod
+    def start(cls) -> None:
+        """Start the periodic flush task"""
+        if cls.enabled() and cls._flush_task is None:
+            cls._flush_task = asyncio.create_task(cls._flush_periodically())
+            logging.info("Started write-behind message buffer")
+
+    @classmethod
+    async def stop(cls) -> None:
+        """Stop the periodic flush and write out anything still buffered"""
+        if cls._flush_task is not None:
+            cls._flush_task.cancel()
+            try:
+                await cls._flush_task
+            except asyncio.CancelledError:
+                pass
+            cls._flush_task = None
+        try:
+            await cls.flush()
+            logging.info("Write-behind message buffer flushed")
+        except Exception:
+            logging.error(f"Lost {len(cls._messages)} buffered messages at shutdown")
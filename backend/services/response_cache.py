@@ -0,0 +1,113 @@
+from backend.core.config import settings
+from backend.database.redis import RedisClient
+from backend.core.metrics import AI_CACHE_ENTRIES, AI_CACHE_LOOKUPS
+from typing import Optional
+import hashlib
+import json
+import logging
+import re
+import time
+
+
+# Read an entry and refresh its LRU position in one round trip
+GET_LUA = """
+local value = redis.call('GET', KEYS[1])
+if value then
+    redis.call('ZADD', KEYS[2], ARGV[1], KEYS[1])
+end
+return value
+"""
+
+
+class ResponseCache:
+    """
+    Redis-backed cache of AI responses.
+
+    Entries are keyed by the normalized prompt plus everything else that shapes
+    the answer (model, temperature, system instructions). A sorted set indexes
+    entries by last access so the cache can be trimmed to a maximum size in LRU
+    order; each entry also carries its own TTL.
+    """
+
+    prefix = "ai_response"
+
+    def __init__(
+        self,
+        ttl: int = settings.AI_CACHE_TTL,
+        max_entries: int = settings.AI_CACHE_MAX_ENTRIES,
+        max_response_bytes: int = settings.AI_CACHE_MAX_RESPONSE_BYTES
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_response_bytes = max_response_bytes
+        self.index_key = f"{self.prefix}:index"
+        self._get_script = None
+
+    @staticmethod
+    def normalize_prompt(prompt: str) -> str:
+        """Normalize a prompt so trivially different spellings share an entry"""
+        return re.sub(r"\s+", " ", prompt).strip().casefold()
+
+    def make_key(self, prompt: str, model: str, temperature: float, instructions: str) -> str:
+        """Build the cache key for a prompt and model configuration"""
+        fingerprint = json.dumps(
+            {
+                "prompt": self.normalize_prompt(prompt),
+                "model": model,
+                "temperature": temperature,
+                "instructions": self.normalize_prompt(instructions),
+            },
+            sort_keys=True
+        )
+        return f"{self.prefix}:{hashlib.sha256(fingerprint.encode()).hexdigest()}"
+
+    async def get(self, key: str) -> Optional[str]:
+        """Get a cached response, recording a hit or miss in the metrics"""
+        value = None
+        if RedisClient.redis:
+            started = time.perf_counter()
+            try:
+                if self._get_script is None:
+                    self._get_script = RedisClient.redis.register_script(GET_LUA)
+                value = await self._get_script(
+                    keys=[key, self.index_key], args=[time.time()]
+                )
+            except Exception as e:
+                logging.error(f"AI cache get error: {str(e)}")
+            finally:
+                RedisClient._record("ai_cache_get", started)
+
+        AI_CACHE_LOOKUPS.labels("hit" if value is not None else "miss").inc()
+        return value
+
+    async def set(self, key: str, value: str) -> bool:
+        """Cache a response and evict the least recently used entries over the size limit"""
+        if not value or len(value.encode()) > self.max_response_bytes:
+            return False
+        if not RedisClient.redis:
+            return False
+
+        try:
+            now = time.time()
+            # Entry, index update and size check in one round trip
+            async with RedisClient.pipeline(transaction=False) as pipe:
+                pipe.set(key, value, ex=self.ttl)
+                pipe.zadd(self.index_key, {key: now})
+                # Drop index members whose entries have already expired
+                pipe.zremrangebyscore(self.index_key, "-inf", now - self.ttl)
+                pipe.zcard(self.index_key)
+                _, _, _, size = await pipe.execute()
+        except Exception as e:
+            logging.error(f"AI cache set error: {str(e)}")
+            return False
+        AI_CACHE_ENTRIES.set(min(size, self.max_entries))
+
+        try:
+            overflow = size - self.max_entries
+            if overflow > 0:
+                evicted = await RedisClient.redis.zpopmin(self.index_key, overflow)
+                if evicted:
+                    await RedisClient.redis.delete(*[member for member, _ in evicted])
+        except Exception as e:
+            logging.error(f"AI cache eviction error: {str(e)}")
+        return True
@@ -0,0 +1,201 @@
+from fastapi import HTTPException, status
+from pymongo import DESCENDING
+from backend.core.config import settings
+from backend.database.mongodb import MongoDB
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+import logging
+import re
+
+# Title matches count for more than a match in one message
+TITLE_WEIGHT = 2.0
+
+
+class SearchService:
+    """
+    Ranked full-text search over a user's messages and session titles.
+
+    Queries use the `user_id`-prefixed text indexes on chat_messages.text and
+    chat_sessions.title, so each search is one indexed query per collection
+    scoped to the user. Message hits are grouped by session and ranked by
+    their best score plus any title score. Where $text is unsupported (the
+    in-memory stand-in, or a Cosmos DB tier without text indexes), a
+    case-insensitive regex match over the user's newest messages is used and
+    scored by term frequency.
+    """
+
+    def __init__(self):
+        self.sessions_collection = "chat_sessions"
+        self.messages_collection = "chat_messages"
+
+    @staticmethod
+    def _terms(query: str) -> List[str]:
+        return list(dict.fromkeys(term.lower() for term in re.findall(r"\w+", query)))
+
+    @staticmethod
+    def _pattern(terms: List[str]) -> "re.Pattern":
+        return re.compile(r"\b(?:" + "|".join(re.escape(term) for term in terms) + r")\w*", re.IGNORECASE)
+
+    async def _text_search(
+        self,
+        collection_name: str,
+        user_id: str,
+        query: str,
+        projection: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        collection = await MongoDB.get_collection(collection_name)
+        cursor = collection.find(
+            {"user_id": user_id, "$text": {"$search": query}},
+            {**projection, "score": {"$meta": "textScore"}}
+        ).sort([("score", {"$meta": "textScore"})]).limit(settings.SEARCH_MAX_CANDIDATES)
+        return await cursor.to_list(settings.SEARCH_MAX_CANDIDATES)
+
+    async def _regex_search(
+        self,
+        collection_name: str,
+        user_id: str,
+        field: str,
+        pattern: "re.Pattern",
+        projection: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        collection = await MongoDB.get_collection(collection_name)
+        cursor = collection.find(
+            {"user_id": user_id, field: {"$regex": pattern.pattern, "$options": "i"}},
+            projection
+        ).sort([("timestamp", DESCENDING)]).limit(settings.SEARCH_MAX_CANDIDATES)
+        documents = await cursor.to_list(settings.SEARCH_MAX_CANDIDATES)
+        for document in documents:
+            document["score"] = float(len(pattern.findall(document.get(field) or "")))
+        return documents
+
+    async def _find(
+        self,
+        collection_name: str,
+        user_id: str,
+        query: str,
+        field: str,
+        pattern: "re.Pattern",
+        projection: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        try:
+            return await self._text_search(collection_name, user_id, query, projection)
+        except Exception as e:
+            logging.info(f"Text search unavailable on {collection_name}, using regex: {str(e)}")
+            return await self._regex_search(collection_name, user_id, field, pattern, projection)
+
+    @staticmethod
+    def _snippet(text: str, pattern: "re.Pattern") -> Dict[str, Any]:
+        """Cut a window around the first match, with character offsets of every match in it"""
+        width = settings.SEARCH_SNIPPET_CHARS
+        first = pattern.search(text)
+        start = 0
+        if first and len(text) > width:
+            start = max(0, min(first.start() - width // 3, len(text) - width))
+        end = min(len(text), start + width)
+        prefix = "…" if start > 0 else ""
+        suffix = "…" if end < len(text) else ""
+        window = text[start:end]
+        highlights = [
+            [len(prefix) + match.start(), len(prefix) + match.end()]
+            for match in pattern.finditer(window)
+        ]
+        return {"text": f"{prefix}{window}{suffix}", "highlights": highlights}
+
+    async def search(self, user_id: str, query: str, offset: int = 0, limit: int = 20) -> Dict[str, Any]:
+        """
+        Search a user's conversations, returning sessions ranked by relevance with
+        highlighted snippets of their best-matching messages
+        """
+        terms = self._terms(query)
+        if not terms:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Search query must contain at least one word"
+            )
+        pattern = self._pattern(terms)
+
+        try:
+            messages = await self._find(
+                self.messages_collection, user_id, query, "text", pattern,
+                {"_id": 0, "id": 1, "session_id": 1, "text": 1, "sender": 1, "timestamp": 1}
+            )
+            titles = await self._find(
+                self.sessions_collection, user_id, query, "title", pattern,
+                {"_id": 0, "id": 1, "title": 1, "timestamp": 1}
+            )
+
+            results: Dict[str, Dict[str, Any]] = {}
+            for session in titles:
+                results[session["id"]] = {
+                    "session_id": session["id"],
+                    "title": session["title"],
+                    "title_highlights": self._snippet(session["title"], pattern)["highlights"],
+                    "timestamp": session.get("timestamp"),
+                    "score": session["score"] * TITLE_WEIGHT,
+                    "latest": session.get("timestamp") or datetime.min,
+                    "matches": [],
+                }
+            for message in messages:
+                result = results.setdefault(message["session_id"], {
+                    "session_id": message["session_id"],
+                    "score": 0.0,
+                    "latest": datetime.min,
+                    "matches": [],
+                })
+                result["latest"] = max(result["latest"], message.get("timestamp") or datetime.min)
+                if len(result["matches"]) < settings.SEARCH_MATCHES_PER_SESSION:
+                    result["matches"].append({
+                        "message_id": message["id"],
+                        "sender": message.get("sender"),
+                        "timestamp": message.get("timestamp"),
+                        "score": message["score"],
+                        "snippet": self._snippet(message.get("text", ""), pattern),
+                    })
+                result["message_score"] = max(result.get("message_score", 0.0), message["score"])
+
+            for result in results.values():
+                result["score"] = round(result["score"] + result.pop("message_score", 0.0), 4)
+                result["matches"].sort(key=lambda match: match["score"], reverse=True)
+
+            # Ties go to the most recent activity
+            ranked = sorted(
+                results.values(),
+                key=lambda result: (result["score"], result["latest"]),
+                reverse=True
+            )
+            for result in ranked:
+                del result["latest"]
+            page = ranked[offset:offset + limit]
+            await self._fill_sessions(user_id, page)
+
+            next_offset: Optional[int] = offset + limit if len(ranked) > offset + limit else None
+            return {"items": page, "next_offset": next_offset, "total": len(ranked)}
+        except HTTPException:
+            raise
+        except Exception as e:
+            logging.error(f"Failed to search chat history: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to search chat history"
+            )
+
+    async def _fill_sessions(self, user_id: str, page: List[Dict[str, Any]]) -> None:
+        """Add titles and timestamps for sessions that matched on message text only"""
+        missing = [result["session_id"] for result in page if "title" not in result]
+        if not missing:
+            return
+        sessions = await MongoDB.get_collection(self.sessions_collection)
+        found = {
+            session["id"]: session
+            async for session in sessions.find(
+                {"id": {"$in": missing}, "user_id": user_id},
+                {"_id": 0, "id": 1, "title": 1, "timestamp": 1}
+            )
+        }
+        for result in page:
+            if "title" in result:
+                continue
+            session = found.get(result["session_id"], {})
+            result["title"] = session.get("title")
+            result["title_highlights"] = []
+            result["timestamp"] = session.get("timestamp")
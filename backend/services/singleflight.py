@@ -0,0 +1,165 @@
+from backend.core.config import settings
+from backend.core.metrics import AI_SINGLEFLIGHT_CALLS
+from backend.database.redis import PubSubListener, RedisClient
+from typing import Awaitable, Callable, Dict, Optional
+import asyncio
+import json
+import logging
+import uuid
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into a single execution.
+
+    Within a worker, callers with the same key await one shared future. Across
+    workers, the first to take a Redis lock becomes the leader and publishes its
+    result on a shared results channel (and briefly under a result key, for
+    followers that start waiting late); followers wait for it and only run the
+    call themselves if the leader fails or the wait times out. Each worker
+    receives results over one subscription however many keys it is waiting on.
+    """
+
+    prefix = "singleflight"
+    channel = "singleflight:results"
+    result_ttl = 10
+    _listener: Optional[PubSubListener] = None
+    # Followers in this worker waiting on a remote leader, by key
+    _waiters: Dict[str, asyncio.Future] = {}
+
+    def __init__(
+        self,
+        lock_ttl: int = settings.SINGLEFLIGHT_LOCK_TTL,
+        wait_timeout: float = settings.SINGLEFLIGHT_WAIT_TIMEOUT
+    ):
+        self.lock_ttl = lock_ttl
+        self.wait_timeout = wait_timeout
+        self._calls: Dict[str, asyncio.Future] = {}
+
+    async def do(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[str]],
+        share_error: Optional[Callable[[BaseException], bool]] = None
+    ) -> str:
+        """
+        Run fn once for all concurrent callers with the same key.
+
+        A leader's exception is re-raised to its local followers unless
+        share_error says it only concerns the leader, in which case each
+        follower tries again and one of them takes over as leader.
+        """
+        while True:
+            future = self._calls.get(key)
+            if future is None:
+                break
+            AI_SINGLEFLIGHT_CALLS.labels("local").inc()
+            try:
+                return await asyncio.shield(future)
+            except Exception as e:
+                if share_error is None or share_error(e):
+                    raise
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        try:
+            result = await self._lead_or_follow(key, fn)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            # Retrieve the exception so an unwatched future does not warn
+            future.exception()
+            raise
+        finally:
+            self._calls.pop(key, None)
+
+    async def _lead_or_follow(self, key: str, fn: Callable[[], Awaitable[str]]) -> str:
+        if not RedisClient.redis:
+            AI_SINGLEFLIGHT_CALLS.labels("leader").inc()
+            return await fn()
+
+        lock_key = f"{self.prefix}:lock:{key}"
+        token = uuid.uuid4().hex
+        try:
+            leader = await RedisClient.redis.set(lock_key, token, nx=True, ex=self.lock_ttl)
+        except Exception as e:
+            logging.error(f"Singleflight lock error: {str(e)}")
+            AI_SINGLEFLIGHT_CALLS.labels("leader").inc()
+            return await fn()
+
+        if leader:
+            return await self._lead(key, lock_key, token, fn)
+
+        result = await self._follow(key)
+        if result is not None:
+            AI_SINGLEFLIGHT_CALLS.labels("remote").inc()
+            return result
+        AI_SINGLEFLIGHT_CALLS.labels("leader").inc()
+        return await fn()
+
+    async def _lead(self, key: str, lock_key: str, token: str, fn: Callable[[], Awaitable[str]]) -> str:
+        AI_SINGLEFLIGHT_CALLS.labels("leader").inc()
+        outcome = {"key": key, "ok": False}
+        try:
+            result = await fn()
+            outcome = {"key": key, "ok": True, "value": result}
+            return result
+        finally:
+            try:
+                payload = json.dumps(outcome)
+                if outcome["ok"]:
+                    await RedisClient.redis.set(f"{self.prefix}:result:{key}", payload, ex=self.result_ttl)
+                await RedisClient.redis.publish(self.channel, payload)
+                await RedisClient.release_lock(lock_key, token)
+            except Exception as e:
+                logging.error(f"Singleflight publish error: {str(e)}")
+
+    async def _follow(self, key: str) -> Optional[str]:
+        """Wait for another worker's result; None means compute it ourselves"""
+        if self._listener is None or not self._listener.ready.is_set():
+            # Not subscribed, so the leader's result could be missed
+            return None
+        future = asyncio.get_running_loop().create_future()
+        self._waiters[key] = future
+        try:
+            # Registered before checking the result key so a result cannot slip between the two
+            stored = await RedisClient.redis.get(f"{self.prefix}:result:{key}")
+            if stored is not None:
+                return json.loads(stored)["value"]
+            outcome = await asyncio.wait_for(future, timeout=self.wait_timeout)
+            return outcome["value"] if outcome.get("ok") else None
+        except asyncio.TimeoutError:
+            logging.warning(f"Timed out waiting for in-flight AI request {key}")
+            return None
+        except Exception as e:
+            logging.error(f"Singleflight follow error: {str(e)}")
+            return None
+        finally:
+            self._waiters.pop(key, None)
+
+    @classmethod
+    def _on_result(cls, data: str) -> None:
+        outcome = json.loads(data)
+        future = cls._waiters.get(outcome["key"])
+        if future is not None and not future.done():
+            future.set_result(outcome)
+
+    @classmethod
+    def _on_subscribe(cls) -> None:
+        # Results published while unsubscribed were missed; don't wait out the timeout for them
+        for future in cls._waiters.values():
+            if not future.done():
+                future.set_result({"ok": False})
+
+    @classmethod
+    async def start_listener(cls) -> None:
+        """Start receiving results from leaders in other workers"""
+        if cls._listener is None:
+            cls._listener = PubSubListener(cls.channel, cls._on_result, cls._on_subscribe)
+        await cls._listener.start()
+
+    @classmethod
+    async def stop_listener(cls) -> None:
+        """Stop the results listener"""
+        if cls._listener is not None:
+            await cls._listener.stop()
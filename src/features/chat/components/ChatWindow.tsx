@@ -2,7 +2,7 @@ import React, { useState, useCallback, useRef, useEffect } from 'react';
 import { Send, Bot, Plus, MessageSquare, LogOut, ChevronLeft, ChevronRight, Download, Home, Sun, Moon } from 'lucide-react';
 import { useAuth } from '../../auth/context/AuthContext';
 import { useNavigate } from 'react-router-dom';
-import { ChatService } from '../services/chatService';
+import { ChatService, MESSAGE_PAGE_SIZE } from '../services/chatService';
 import { Message, ChatSession } from '../types';
 import UserAvatar from '../../../components/UserAvatar';
 import Tooltip from '../../../components/Tooltip';
@@ -21,6 +21,9 @@ export default function ChatWindow({ initialSession }: ChatWindowProps) {
   const [isSidebarOpen, setIsSidebarOpen] = useState(true);
   const [theme, setTheme] = useState<'light' | 'dark'>('dark');
   const messagesEndRef = useRef<HTMLDivElement>(null);
+  const messagesContainerRef = useRef<HTMLDivElement>(null);
+  const [hasOlderMessages, setHasOlderMessages] = useState(false);
+  const [isLoadingOlder, setIsLoadingOlder] = useState(false);
   const [searchQuery, setSearchQuery] = useState('');
 
   const scrollToBottom = useCallback(() => {
@@ -33,7 +36,7 @@ export default function ChatWindow({ initialSession }: ChatWindowProps) {
         const history = await ChatService.getChatHistory();
         setSessions(history);
         if (!currentSession && history.length > 0) {
-          setCurrentSession(history[0]);
+          handleSessionSelect(history[0]);
         } else if (!history.length) {
           handleNewChat();
         }
@@ -45,9 +48,11 @@ export default function ChatWindow({ initialSession }: ChatWindowProps) {
     fetchSessions();
   }, [currentSession]);
 
+  // Only new messages at the end scroll down; older pages are prepended in place
+  const lastMessageId = currentSession?.messages[currentSession.messages.length - 1]?.id;
   useEffect(() => {
     scrollToBottom();
-  }, [currentSession?.messages, scrollToBottom]);
+  }, [lastMessageId, scrollToBottom]);
 
   const toggleTheme = () => {
     setTheme(prev => prev === 'dark' ? 'light' : 'dark');
@@ -60,6 +65,7 @@ export default function ChatWindow({ initialSession }: ChatWindowProps) {
       const newSession = await ChatService.createNewChat();
       setSessions(prev => [newSession, ...prev]);
       setCurrentSession(newSession);
+      setHasOlderMessages(false);
       setInputMessage('');
     } catch (error) {
       console.error('Failed to create new chat:', error);
@@ -135,6 +141,7 @@ export default function ChatWindow({ initialSession }: ChatWindowProps) {
       setIsLoading(true);
       const messages = await ChatService.getSessionMessages(session.id);
       setCurrentSession({ ...session, messages });
+      setHasOlderMessages(messages.length === MESSAGE_PAGE_SIZE);
     } catch (error) {
       console.error('Failed to load session:', error);
     } finally {
@@ -142,6 +149,38 @@ export default function ChatWindow({ initialSession }: ChatWindowProps) {
     }
   };
 
+  const loadOlderMessages = async () => {
+    const container = messagesContainerRef.current;
+    const oldest = currentSession?.messages[0];
+    if (!container || !currentSession || !oldest || !hasOlderMessages || isLoadingOlder) return;
+
+    const sessionId = currentSession.id;
+    try {
+      setIsLoadingOlder(true);
+      const older = await ChatService.getSessionMessages(sessionId, oldest.id);
+      const previousHeight = container.scrollHeight;
+      setCurrentSession((prev: ChatSession | null) => {
+        if (!prev || prev.id !== sessionId) return prev;
+        return { ...prev, messages: [...older, ...prev.messages] };
+      });
+      setHasOlderMessages(older.length === MESSAGE_PAGE_SIZE);
+      // Keep the message the user was reading in place
+      requestAnimationFrame(() => {
+        container.scrollTop += container.scrollHeight - previousHeight;
+      });
+    } catch (error) {
+      console.error('Failed to load older messages:', error);
+    } finally {
+      setIsLoadingOlder(false);
+    }
+  };
+
+  const handleMessagesScroll = () => {
+    if (messagesContainerRef.current && messagesContainerRef.current.scrollTop < 100) {
+      loadOlderMessages();
+    }
+  };
+
   const handleLogout = async () => {
     try {
       await logout();
@@ -335,9 +374,20 @@ export default function ChatWindow({ initialSession }: ChatWindowProps) {
           </div>
         </div>
 
-        <div className={`flex-1 overflow-y-auto p-4 space-y-4 ${
-          theme === 'dark' ? 'bg-dark-bg' : 'bg-light-bg'
-        }`}>
+        <div
+          ref={messagesContainerRef}
+          onScroll={handleMessagesScroll}
+          className={`flex-1 overflow-y-auto p-4 space-y-4 ${
+            theme === 'dark' ? 'bg-dark-bg' : 'bg-light-bg'
+          }`}
+        >
+          {isLoadingOlder && (
+            <p className={`text-center text-xs ${
+              theme === 'dark' ? 'text-dark-text-secondary' : 'text-light-text-secondary'
+            }`}>
+              Loading earlier messages...
+            </p>
+          )}
           {currentSession?.messages.map((message: Message) => (
             <div
               key={message.id}
@@ -21,8 +21,10 @@ export function useChat() {
           setIsLoading(true);
           const sessions = await ChatService.getChatHistory();
           if (sessions.length > 0) {
-            setCurrentSession(sessions[0]);
-            setMessages(sessions[0].messages);
+            // The session list carries no messages; load the newest page separately
+            const latest = await ChatService.getSessionMessages(sessions[0].id);
+            setCurrentSession({ ...sessions[0], messages: latest });
+            setMessages(latest);
           }
         } catch (err) {
           setError(err instanceof Error ? err.message : 'Failed to load chat history');
@@ -1,6 +1,8 @@
 import { api } from '../../../lib/api';
 import { Message, ChatSession } from '../types';
 
+export const MESSAGE_PAGE_SIZE = 50;
+
 export class ChatService {
   static async sendMessage(content: string, sessionId: string): Promise<Message> {
     try {
@@ -29,9 +31,12 @@ export class ChatService {
     }
   }
 
-  static async getSessionMessages(sessionId: string): Promise<Message[]> {
+  static async getSessionMessages(sessionId: string, before?: string): Promise<Message[]> {
     try {
-      const response = await api.get<Message[]>(`/chat/${sessionId}/messages`);
+      // The newest page, or the page just before the message id in `before`
+      const response = await api.get<Message[]>(`/chat/${sessionId}/messages`, {
+        params: { limit: MESSAGE_PAGE_SIZE, before }
+      });
       return response.data;
     } catch (error: any) {
       throw new Error(error.response?.data?.detail || 'Failed to fetch session messages');